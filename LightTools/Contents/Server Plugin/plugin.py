@@ -8,6 +8,11 @@ try:
     import indigo
 except ImportError:
     pass
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import operator
 import os
 import sys
 import time
@@ -16,6 +21,210 @@ import json
 
 # Note the "indigo" module is automatically imported and made available inside
 # our global name space by the host process.
+
+# Plugin device types backed by a pair of relays
+_RELAY2_TYPE_IDS = frozenset({'Relay2Dimmer', 'Relay2Fan'})
+
+# Relay-state combination for each brightness level 0-100, rounded to the
+# nearest of the four valid levels - built once at import so the per-call
+# conversion is a single indexed lookup
+_LEVEL_TO_STATES = tuple(
+    (True, True) if level > 83 else
+    (False, True) if level > 49 else
+    (True, False) if level > 16 else
+    (False, False)
+    for level in range(101))
+
+# Level for each relay-state combination, indexed by relay1_on + 2*relay2_on
+_STATES_TO_LEVEL = (0, 33, 66, 100)
+
+# Relay-state combination for each fan speed index 0-3 - the fan action
+# paths go straight from speed index to relays without the level round-trip
+_SPEED_TO_RELAYS = ((False, False), (True, False), (False, True), (True, True))
+
+# Scene-state appliers dispatched on the saved type tag. Each takes the
+# device id and the canonical (type, *fields) tuple; indigo is resolved at
+# call time, after the host has injected it
+def _apply_dimmer(dev_id, saved):
+    indigo.dimmer.setBrightness(dev_id, value=saved[1])
+
+
+def _apply_relay(dev_id, saved):
+    if saved[1]:
+        indigo.device.turnOn(dev_id)
+    else:
+        indigo.device.turnOff(dev_id)
+
+
+def _apply_thermostat(dev_id, saved):
+    # Convert integer values back to enums
+    indigo.thermostat.setHvacMode(dev_id, value=indigo.kHvacMode(saved[1]))
+    indigo.thermostat.setFanMode(dev_id, value=indigo.kFanMode(saved[2]))
+    indigo.thermostat.setCoolSetpoint(dev_id, value=saved[3])
+    indigo.thermostat.setHeatSetpoint(dev_id, value=saved[4])
+
+
+def _apply_fan(dev_id, saved):
+    indigo.speedcontrol.setSpeedLevel(dev_id, value=saved[1])
+
+
+def _apply_blind(dev_id, saved):
+    # Blinds typically use setBrightness for position
+    indigo.dimmer.setBrightness(dev_id, value=saved[1])
+
+
+_SCENE_APPLIERS = {
+    'dimmer': _apply_dimmer,
+    'relay': _apply_relay,
+    'thermostat': _apply_thermostat,
+    'fan': _apply_fan,
+    'blind': _apply_blind,
+}
+
+
+def _unwrap_action_value(value):
+    """Normalize action.actionValue to a scalar.
+
+    Indigo hands it back as a bare number or a one-element list depending
+    on which control triggered the action.
+    """
+    if isinstance(value, list):
+        return value[0] if value else 0
+    return value
+
+
+# How long a burst of monitored-member updates is allowed to settle before
+# a dirty scene is recompared - a scene being applied changes several
+# devices back to back, and one compare of the final state is enough
+_SCENE_SETTLE_SECONDS = 0.1
+
+# How often the poll loop re-reads the child relays of Relay2 devices.
+# Mirroring is event-driven through deviceUpdated, so this sweep only
+# catches changes a missed callback would otherwise leave stale
+_RELAY2_SWEEP_SECONDS = 30.0
+
+# Fan speed names indexed by speed index
+_SPEED_NAMES = ('off', 'low', 'medium', 'high')
+
+# Full Relay2 decode of the 2-bit relay state: (level, speed index, speed name).
+# Level and speed index are completely determined by the relay pair, so one
+# lookup replaces the level conversion, the // 33 division, and the name list
+_RELAY2_TABLE = {
+    (False, False): (0, 0, _SPEED_NAMES[0]),
+    (True, False): (33, 1, _SPEED_NAMES[1]),
+    (False, True): (66, 2, _SPEED_NAMES[2]),
+    (True, True): (100, 3, _SPEED_NAMES[3]),
+}
+
+
+def _safe_int(value):
+    """int() that returns None on failure, without raising on well-formed input.
+
+    Raising and catching ValueError is surprisingly expensive in Python, so
+    check the common cases (already an int, or a digit string) first and only
+    fall back to the raising path for the odd ones like floats.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        # isdecimal() rather than isdigit(): the latter accepts characters
+        # like superscripts that int() then rejects, and only one leading
+        # minus sign is allowed
+        stripped = value.strip()
+        digits = stripped[1:] if stripped.startswith('-') else stripped
+        if digits.isdecimal():
+            return int(stripped)
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _extract_dimmer_state(dev):
+    return ('dimmer', dev.brightness, dev.onState)
+
+
+def _extract_relay_state(dev):
+    return ('relay', dev.onState)
+
+
+def _extract_thermostat_state(dev):
+    # Convert enum values to their integer equivalents for storage
+    return ('thermostat', int(dev.hvacMode), int(dev.fanMode),
+            float(dev.coolSetpoint), float(dev.heatSetpoint))
+
+
+def _extract_fan_state(dev):
+    return ('fan', dev.speedLevel if hasattr(dev, 'speedLevel') else 0, dev.onState)
+
+
+# Each blind's actual position state key, so the lowercase scan runs once per device
+_position_key_cache = {}
+
+
+def _extract_blind_state(dev):
+    """Fallback for unknown device classes: a blind if it has a position state"""
+    key = _position_key_cache.get(dev.id)
+    if key is None:
+        for candidate in dev.states:
+            if candidate.lower() == 'position':
+                key = _position_key_cache[dev.id] = candidate
+                break
+        else:
+            return None
+    return ('blind', dev.states[key])
+
+
+# Specialized scene-state extractors dispatched on the device class name.
+# Each returns a canonical (type, *fields) tuple whose field order matches
+# _SCENE_FIELDS, so a scene check is a single tuple equality
+_STATE_EXTRACTORS = {
+    'DimmerDevice': _extract_dimmer_state,
+    'RelayDevice': _extract_relay_state,
+    'ThermostatDevice': _extract_thermostat_state,
+    'SpeedControlDevice': _extract_fan_state,
+}
+
+# Per-type payload field order for the compact savedStates format. A saved
+# device entry is [dev_id, type, *fields] and a variable entry is
+# [var_id, value], so scene checks iterate two small lists instead of
+# picking ids back out of string keys
+_SCENE_FIELDS = {
+    'dimmer': ('brightness', 'onState'),
+    'relay': ('onState',),
+    'thermostat': ('hvacMode', 'fanMode', 'coolSetpoint', 'heatSetpoint'),
+    'fan': ('speedLevel', 'onState'),
+    'blind': ('position',),
+}
+
+# Display label and unit suffix per field for the comparison report
+_SCENE_FIELD_LABELS = {
+    'brightness': ('Brightness', '%'),
+    'onState': ('OnState', ''),
+    'hvacMode': ('HVAC Mode', ''),
+    'fanMode': ('Fan Mode', ''),
+    'coolSetpoint': ('Cool Setpoint', '°'),
+    'heatSetpoint': ('Heat Setpoint', '°'),
+    'speedLevel': ('Speed Level', ''),
+    'position': ('Position', '%'),
+}
+
+
+def _upgrade_saved_states(old_states):
+    """Convert a legacy {'device_<id>': {...}} savedStates dict to list form"""
+    upgraded = {'d': [], 'v': []}
+    for item_key, state in old_states.items():
+        if item_key.startswith('device_'):
+            dev_id = _safe_int(item_key[7:])
+            fields = _SCENE_FIELDS.get(state.get('type'))
+            if dev_id is not None and fields is not None:
+                upgraded['d'].append([dev_id, state['type']] + [state[f] for f in fields])
+        elif item_key.startswith('variable_'):
+            var_id = _safe_int(item_key[9:])
+            if var_id is not None:
+                upgraded['v'].append([var_id, str(state.get('value'))])
+    return upgraded
+
 ################################################################################
 class Plugin(indigo.PluginBase):
     
@@ -24,59 +233,237 @@ class Plugin(indigo.PluginBase):
         self.debug: bool = False
         self.last_variable_values = {}  # Track variable values for change detection
         self.last_device_brightness = {}  # Track device brightness for change detection
-        self.flash_threads = {}  # Track active flash threads by a unique key
+        self.flash_threads = {}  # Track active flash futures by a unique key
+        self._flash_id_counter = itertools.count()  # Collision-safe ids for flash sequences
         self.flash_stop_events = {}  # Threading events to signal stop
         self.flash_lock = threading.Lock()  # Lock for thread-safe operations
         self.flashing_devices = set()  # Track which devices are currently flashing
         self.scene_off_timers = {}  # Track 10-second timers after manual OFF for scenes
         self.scene_lock = threading.Lock()  # Lock for scene operations
-        self.relay2_pending_changes = {}  # Track pending relay changes for Relay2Dimmer/Fan devices
-        self.relay2_lock = threading.Lock()  # Lock for relay2 operations
         self.relay2_last_states = {}  # Track last known relay states for change detection
-    
+        # Guards the check-then-set sections on the last-value caches, which
+        # are hit from the poll thread and Indigo's action/callback threads.
+        # Critical sections stay tiny - server calls happen outside the lock
+        self._cache_lock = threading.RLock()
+        # Per-device write generation, bumped (under the lock) before an
+        # action writes the linked variable. A poll tick that saw an older
+        # generation skips its reconciliation instead of echoing a value it
+        # read mid-write back at the device
+        self._inflight = {}
+        self._device_cache_by_class = None  # Lazily built buckets of (id, name) tuples keyed by device class
+        self._var_list_cache = None  # Lazily built (id, name) list of all variables
+        self._scale_cache = {}  # Precomputed scale conversion coefficients per device id
+        self._var_id_cache = {}  # Resolved linked-variable id per dimmer device id
+        self._scene_state = {}  # scene dev id -> parsed saved state, the checks' source of truth
+        # Reverse indexes and result cache so steady-state scene checks are a
+        # couple of dict lookups: a full compare only runs after a monitored
+        # device or variable actually changed
+        self._scene_members = {}  # monitored dev id -> scene ids that include it
+        self._scene_var_members = {}  # monitored var id -> scene ids that include it
+        self._scene_match_cache = {}  # scene id -> last full-compare result
+        self._dirty_scenes = set()  # scenes whose members changed since the last compare
+        self._scene_recheck_due = {}  # scene id -> monotonic time its member burst settles
+        self._relay_to_parents = None  # Lazily built relay dev id -> owning Relay2* device ids
+        self._poll_ids = None  # Lazily built (dev id, type id) roster for the poll loop
+        self._scene_timer_heap = []  # (check_time, scene id) heap of pending OFF settle checks
+        self._poll_quiet_cycles = 0  # Consecutive poll sweeps that saw no changes
+        self._relay2_sweep_due = 0.0  # Next time.time() the Relay2 safety sweep runs
+        # Shared scheduler for delayed relay writes - one worker drains a
+        # per-device pending map instead of one sleeping thread per action
+        self._relay2_config = {}  # dev id -> (relay1_id, relay2_id) read from pluginProps once
+        # Target levels for the constant dimmer actions - built here because
+        # the indigo enums only exist once the host has injected the module
+        self._dimmer_target_levels = {
+            indigo.kDimmerRelayAction.TurnOn: 100,
+            indigo.kDimmerRelayAction.TurnOff: 0,
+        }
+        self._pending_relay2 = {}
+        self._relay2_lock = threading.Lock()
+        self._relay2_event = threading.Event()
+        self._relay2_worker = None
+        # Long-lived worker pool for flash sequences - avoids paying the
+        # thread-creation cost on every flash action
+        self._flash_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix='flash')
+
+    def _get_device_buckets(self):
+        """Return (and lazily build) the device list cache, bucketed by device class.
+
+        The get*List callbacks are called repeatedly as config dialogs open, so
+        instead of re-scanning every Indigo device each time we scan once and
+        bucket the results. The cache is invalidated whenever a device is
+        created or deleted.
+        """
+        buckets = self._device_cache_by_class
+        if buckets is None:
+            buckets = {
+                'DimmerDevice': [],
+                'RelayDevice': [],
+                'ThermostatDevice': [],
+                'SpeedControlDevice': [],
+                'PluginFan': [],
+                'Blind': [],
+            }
+            for dev in indigo.devices:
+                entry = (str(dev.id), dev.name)
+                class_name = type(dev).__name__
+                if class_name in buckets:
+                    buckets[class_name].append(entry)
+                elif hasattr(dev, 'speedIndex') or hasattr(dev, 'speedLevel'):
+                    # Plugin-based speed control devices (like fans)
+                    buckets['PluginFan'].append(entry)
+                # Blinds typically have a position state
+                if any(state.lower() == 'position' for state in dev.states):
+                    buckets['Blind'].append(entry)
+
+            # Sort everything once here so the get*List callbacks can return
+            # the buckets directly without re-sorting on every dialog refresh
+            by_name = operator.itemgetter(1)
+            for bucket in buckets.values():
+                bucket.sort(key=by_name)
+            buckets['RelayOrDimmer'] = sorted(
+                buckets['RelayDevice'] + buckets['DimmerDevice'], key=by_name)
+            buckets['SceneControllable'] = sorted(
+                buckets['DimmerDevice'] + buckets['RelayDevice'] +
+                buckets['ThermostatDevice'] + buckets['SpeedControlDevice'] +
+                buckets['PluginFan'], key=by_name)
+
+            self._device_cache_by_class = buckets
+        return buckets
+
+    def _get_poll_ids(self):
+        """Return (and lazily build) the (dev id, type id) roster the poll loop walks.
+
+        The roster holds ids rather than device objects so every poll still
+        reads fresh state from the server; what it saves is re-running the
+        filtered iterator over all of Indigo's devices every second. Only
+        device types the loop actually services make the list, and devices
+        whose configuration is incomplete (no linked variable, missing
+        relay assignment) are filtered out here instead of per tick.
+        Rebuilt on device lifecycle and config changes.
+        """
+        poll_ids = self._poll_ids
+        if poll_ids is None:
+            poll_ids = []
+            for dev in indigo.devices.iter(filter="self"):
+                type_id = dev.deviceTypeId
+                if type_id == "myDimmerType":
+                    if self._get_var_id(dev):
+                        poll_ids.append((dev.id, type_id))
+                elif type_id == "SceneDevice":
+                    poll_ids.append((dev.id, type_id))
+                elif type_id in _RELAY2_TYPE_IDS:
+                    relay1_id, relay2_id = self._get_relay2_config(dev)
+                    if relay1_id and relay2_id:
+                        poll_ids.append((dev.id, type_id))
+            self._poll_ids = poll_ids
+        return poll_ids
+
+    def deviceCreated(self, dev):
+        self._device_cache_by_class = None
+        self._relay_to_parents = None
+        self._poll_ids = None
+
+    def deviceDeleted(self, dev):
+        self._device_cache_by_class = None
+        self._relay_to_parents = None
+        self._poll_ids = None
+
+    def _get_relay_parents(self):
+        """Return (and lazily build) the relay id -> Relay2* owner index.
+
+        deviceUpdated fires for every relay in the installation, so scanning
+        all plugin devices per event scales with the number of Relay2
+        dimmers/fans. Index them once and answer each event with a dict
+        lookup instead; the index is rebuilt after any plugin device is
+        created, deleted, or reconfigured.
+        """
+        index = self._relay_to_parents
+        if index is None:
+            index = {}
+            for dev in indigo.devices.iter(filter="self"):
+                if dev.deviceTypeId in _RELAY2_TYPE_IDS:
+                    for relay_id in self._get_relay2_config(dev):
+                        if relay_id is not None:
+                            index.setdefault(relay_id, []).append(dev.id)
+            self._relay_to_parents = index
+        return index
+
+    def variableCreated(self, var):
+        self._var_list_cache = None
+
+    def variableDeleted(self, var):
+        self._var_list_cache = None
+
+    def variableUpdated(self, orig_var, new_var):
+        # Only a rename affects the cached list - value changes happen constantly
+        if orig_var.name != new_var.name:
+            self._var_list_cache = None
+        # A monitored variable's value changed - its scenes need a fresh compare
+        if orig_var.value != new_var.value:
+            # Snap the poll loop out of its idle backoff on the next wakeup
+            self._poll_quiet_cycles = 0
+            owners = self._scene_var_members.get(new_var.id)
+            if owners:
+                self._dirty_scenes.update(owners)
+                due = time.monotonic() + _SCENE_SETTLE_SECONDS
+                for sid in owners:
+                    self._scene_recheck_due[sid] = due
+
     def getVariableList(self, filter="", valuesDict=None, typeId="", targetId=0):
-        items = []
-        for var in indigo.variables.iter():
-            items.append((str(var.id), var.name))
-        if not items:
-            items.append(("", "-- No variables found --"))
+        items = self._var_list_cache
+        if items is None:
+            items = [(str(var.id), var.name) for var in indigo.variables.iter()]
+            items.sort(key=operator.itemgetter(1))
+            if not items:
+                items.append(("", "-- No variables found --"))
+            self._var_list_cache = items
         return items
     
     def getDeviceList(self, filter="", valuesDict=None, typeId="", targetId=0):
         """Get list of devices that are relays or dimmers"""
-        items = []
-        for dev in indigo.devices:
-            # Check if device is a relay or dimmer by looking at its base class
-            if hasattr(dev, '__class__'):
-                class_name = dev.__class__.__name__
-                # Include Relay and Dimmer devices
-                if class_name in ['RelayDevice', 'DimmerDevice']:
-                    items.append((str(dev.id), dev.name))
-        
+        items = self._get_device_buckets()['RelayOrDimmer']
+
         if not items:
-            items.append(("", "-- No compatible devices found --"))
-        return sorted(items, key=lambda x: x[1])
+            return [("", "-- No compatible devices found --")]
+        return items
     
     def _extract_var_id(self, var_id_str):
-        """Helper to extract variable ID from Indigo.List or string"""
-        if not var_id_str:
-            return None
-        
-        # Handle Indigo.List objects
-        if hasattr(var_id_str, '__iter__') and not isinstance(var_id_str, str):
-            try:
-                var_id_str = list(var_id_str)[0] if var_id_str else ""
-            except (IndexError, TypeError):
-                return None
-        
-        if not var_id_str:
-            return None
-        
-        try:
-            return int(var_id_str)
-        except (ValueError, TypeError):
-            return None
+        """Helper to extract a single variable ID from Indigo.List or string"""
+        ids = self._coerce_ids(var_id_str)
+        return ids[0] if ids else None
     
+    def _coerce_ids(self, raw):
+        """Normalize a device/variable id selection to a list of ints.
+
+        Indigo list controls can hand back an Indigo.List, a plain list, a
+        nested list, or a bare string depending on the widget, so do the
+        unwrapping and int conversion once here - downstream code only ever
+        deals in int ids.
+        """
+        if not raw:
+            return []
+
+        # Handle Indigo.List objects - convert to regular list
+        if hasattr(raw, '__iter__') and not isinstance(raw, str):
+            raw = list(raw)
+        if not isinstance(raw, list):
+            raw = [raw]
+
+        ids = []
+        for item in raw:
+            if isinstance(item, list):
+                # If it's a nested list, take the first item
+                item = item[0] if item else ""
+            if not item:
+                continue
+            item_id = _safe_int(item)
+            if item_id is None:
+                self.logger.debug(f"Ignoring invalid id: {item!r}")
+            else:
+                ids.append(item_id)
+        return ids
+
     def _get_brightness(self, dev):
         """Get current brightness from device"""
         # For dimmer devices, use the brightness property
@@ -111,158 +498,208 @@ class Plugin(indigo.PluginBase):
             return scale_min, scale_max, is_float_scale
         except (ValueError, TypeError):
             return 0.0, 100.0, False
-    
-    def _variable_to_brightness(self, var_value, scale_min, scale_max):
+
+    def _get_device_scale(self, dev):
+        """Get the cached scale tuple for a device, computing it on first use.
+
+        The tuple is (scale_min, scale_max, is_float_scale, pct_per_unit,
+        unit_per_pct, decimals). The conversion coefficients are precomputed
+        here so the per-poll conversions are just a multiply and a clamp
+        instead of re-parsing the pluginProps strings every time. The cache
+        entry is cleared whenever the device config dialog is saved.
+        """
+        scale = self._scale_cache.get(dev.id)
+        if scale is None:
+            scale_min, scale_max, is_float_scale = self._get_scale_params(dev)
+            scale_range = scale_max - scale_min
+            # For small ranges (like 0-1, 0-10) use 2 decimal places, else 1
+            decimals = 2 if scale_range <= 10 else 1
+            scale = (scale_min, scale_max, is_float_scale,
+                     100.0 / scale_range, scale_range / 100.0, decimals)
+            self._scale_cache[dev.id] = scale
+        return scale
+
+    def _get_var_id(self, dev):
+        """Get the cached linked-variable id for a dimmer, resolving it on first use.
+
+        dev.pluginProps materializes a fresh dict on every access, so the
+        poll loop and the dimmer action handlers would otherwise re-read and
+        re-parse the variableId prop for every tick and action. A None entry
+        (no variable configured) is cached too. Entries are cleared when the
+        device stops or its config dialog is saved.
+        """
+        dev_id = dev.id
+        cache = self._var_id_cache
+        if dev_id not in cache:
+            cache[dev_id] = self._extract_var_id(dev.pluginProps.get("variableId", ""))
+        return cache[dev_id]
+
+    def _variable_to_brightness(self, var_value, scale):
         """Convert variable value (on custom scale) to brightness (0-100)
         Returns: (brightness, was_clamped, clamped_value)
         """
+        scale_min, scale_max, _, pct_per_unit, _, _ = scale
         try:
             value = float(var_value)
-            original_value = value
-            
-            # Clamp to scale range and track if we clamped
-            was_clamped = False
-            if value < scale_min:
-                value = scale_min
-                was_clamped = True
-            elif value > scale_max:
-                value = scale_max
-                was_clamped = True
-            
-            # Convert to 0-100 range
-            scale_range = scale_max - scale_min
-            brightness = ((value - scale_min) / scale_range) * 100
-            
-            return int(round(brightness)), was_clamped, value
         except (ValueError, TypeError):
             return None, False, None
-    
-    def _brightness_to_variable(self, brightness, scale_min, scale_max, is_float_scale):
+
+        # Clamp to scale range and track if we clamped
+        was_clamped = False
+        if value < scale_min:
+            value = scale_min
+            was_clamped = True
+        elif value > scale_max:
+            value = scale_max
+            was_clamped = True
+
+        # Convert to 0-100 range
+        brightness = (value - scale_min) * pct_per_unit
+
+        return int(round(brightness)), was_clamped, value
+
+    def _brightness_to_variable(self, brightness, scale):
         """Convert brightness (0-100) to variable value (on custom scale)"""
+        scale_min, _, is_float_scale, _, unit_per_pct, decimals = scale
+
         # Clamp brightness to 0-100
         brightness = max(0, min(100, brightness))
-        
+
         # Convert to custom scale
-        scale_range = scale_max - scale_min
-        value = (brightness / 100.0) * scale_range + scale_min
-        
+        value = brightness * unit_per_pct + scale_min
+
         # Return as integer or float based on scale type
         if is_float_scale:
-            # For float scales, use appropriate precision based on range
-            if scale_range <= 1:
-                # For 0-1 range, use 2 decimal places (0.70 = 0.7)
-                result = str(round(value, 2))
-            elif scale_range <= 10:
-                result = str(round(value, 2))
-            else:
-                result = str(round(value, 1))
-        else:
-            result = str(int(round(value)))
-        
-        return result
+            return str(round(value, decimals))
+        return str(int(round(value)))
     
     def _flash_device_thread(self, thread_id, device_ids, flash_count, flash_duration, gap_duration, 
                              flash_to_brightness, flash_to_minimum):
         """Thread function to handle the flashing sequence"""
         try:
-            # Store original states FIRST before marking as flashing
-            original_states = {}
-            for dev_id in device_ids:
+            # Grab the stop event once - looking it up (and allocating a throwaway
+            # Event as the default) on every iteration is wasted work
+            stop_event = self.flash_stop_events.get(thread_id) or threading.Event()
+
+            # Store original states FIRST before marking as flashing. The state
+            # is kept in parallel arrays indexed by position so the hot loops
+            # below work off a plain int index instead of nested dict lookups.
+            int_ids = []
+            orig_is_dimmer = []
+            orig_brightness = []
+            orig_on = []
+            for did in device_ids:
                 try:
-                    dev = indigo.devices[int(dev_id)]
-                    if hasattr(dev, 'brightness'):
-                        # It's a dimmer
-                        original_states[dev_id] = {
-                            'type': 'dimmer',
-                            'brightness': dev.brightness,
-                            'on': dev.onState
-                        }
-                    else:
-                        # It's a relay
-                        original_states[dev_id] = {
-                            'type': 'relay',
-                            'on': dev.onState
-                        }
+                    dev = indigo.devices[did]
+                    is_dimmer = hasattr(dev, 'brightness')
+                    int_ids.append(did)
+                    orig_is_dimmer.append(is_dimmer)
+                    orig_brightness.append(dev.brightness if is_dimmer else 0)
+                    orig_on.append(dev.onState)
                 except Exception as e:
-                    self.logger.error(f"Error getting original state for device {dev_id}: {e}")
+                    self.logger.error("Error getting original state for device %s: %s", did, e)
                     continue
-            
-            # NOW mark these devices as currently flashing
-            with self.flash_lock:
-                for dev_id in device_ids:
-                    self.flashing_devices.add(int(dev_id))
+
+            # NOW mark these devices as currently flashing. Single set.add calls
+            # are atomic under the CPython GIL, so no lock is needed here - the
+            # flash_lock is reserved for multi-structure updates.
+            for did in int_ids:
+                self.flashing_devices.add(did)
             
             # Set defaults for brightness levels
             max_brightness = flash_to_brightness if flash_to_brightness is not None else 100
             min_brightness = flash_to_minimum if flash_to_minimum is not None else 0
-            
+
+            # Track the last command sent to each device so identical consecutive
+            # commands can be skipped - every command is a round-trip to the
+            # Indigo server, so only send the ones that actually change something
+            last_commanded = {}
+
+            # Schedule each phase against absolute deadlines so slow Indigo
+            # commands don't stretch the cadence - each cycle starts at
+            # t0 + flash_num * period regardless of how long the commands took
+            period = flash_duration + gap_duration
+            t0 = time.monotonic()
+
             # Perform the flashes
             for flash_num in range(flash_count):
                 # Check if we should stop
-                if self.flash_stop_events.get(thread_id, threading.Event()).is_set():
-                    self.logger.info(f"Flash sequence {thread_id} cancelled")
+                if stop_event.is_set():
+                    self.logger.info("Flash sequence %s cancelled", thread_id)
                     break
                 
                 # Flash to MAX brightness first
-                for dev_id, original_state in original_states.items():
+                for i, did in enumerate(int_ids):
                     try:
-                        dev = indigo.devices[int(dev_id)]
-                        
-                        if original_state['type'] == 'dimmer':
-                            indigo.dimmer.setBrightness(dev.id, value=max_brightness)
+                        if orig_is_dimmer[i]:
+                            if last_commanded.get(did) != max_brightness:
+                                indigo.dimmer.setBrightness(did, value=max_brightness)
+                                last_commanded[did] = max_brightness
                         else:
                             # Relay - turn on
-                            indigo.device.turnOn(dev.id)
-                    
+                            if last_commanded.get(did) is not True:
+                                indigo.device.turnOn(did)
+                                last_commanded[did] = True
+
                     except Exception as e:
-                        self.logger.error(f"Error flashing device {dev_id} to max: {e}")
+                        self.logger.error("Error flashing device %s to max: %s", did, e)
                 
-                # Wait for flash duration
-                if self.flash_stop_events.get(thread_id, threading.Event()).wait(flash_duration):
-                    self.logger.info(f"Flash sequence {thread_id} cancelled during flash")
+                # Wait until the end of the ON phase
+                deadline = t0 + flash_num * period + flash_duration
+                if stop_event.wait(max(0.0, deadline - time.monotonic())):
+                    self.logger.info("Flash sequence %s cancelled during flash", thread_id)
                     break
                 
                 # Flash to MIN brightness
-                for dev_id, original_state in original_states.items():
+                for i, did in enumerate(int_ids):
                     try:
-                        dev = indigo.devices[int(dev_id)]
-                        
-                        if original_state['type'] == 'dimmer':
-                            indigo.dimmer.setBrightness(dev.id, value=min_brightness)
+                        if orig_is_dimmer[i]:
+                            if last_commanded.get(did) != min_brightness:
+                                indigo.dimmer.setBrightness(did, value=min_brightness)
+                                last_commanded[did] = min_brightness
                         else:
                             # Relay - turn off
-                            indigo.device.turnOff(dev.id)
-                    
+                            if last_commanded.get(did) is not False:
+                                indigo.device.turnOff(did)
+                                last_commanded[did] = False
+
                     except Exception as e:
-                        self.logger.error(f"Error flashing device {dev_id} to min: {e}")
+                        self.logger.error("Error flashing device %s to min: %s", did, e)
                 
-                # Wait for gap (unless this was the last flash)
+                # Wait out the gap (unless this was the last flash)
                 if flash_num < flash_count - 1:
-                    if self.flash_stop_events.get(thread_id, threading.Event()).wait(gap_duration):
-                        self.logger.info(f"Flash sequence {thread_id} cancelled during gap")
+                    deadline = t0 + (flash_num + 1) * period
+                    if stop_event.wait(max(0.0, deadline - time.monotonic())):
+                        self.logger.info("Flash sequence %s cancelled during gap", thread_id)
                         break
             
-            # Ensure all devices are back to original state
-            for dev_id, original_state in original_states.items():
+            # Ensure all devices are back to original state. Check what the
+            # device actually shows now rather than trusting the last command -
+            # something else may have moved it mid-flash - and skip devices
+            # already at their original state so no superfluous commands go out.
+            for i, did in enumerate(int_ids):
                 try:
-                    dev = indigo.devices[int(dev_id)]
-                    
-                    if original_state['type'] == 'dimmer':
-                        indigo.dimmer.setBrightness(dev.id, value=original_state['brightness'])
+                    dev = indigo.devices[did]
+                    if orig_is_dimmer[i]:
+                        if dev.brightness != orig_brightness[i]:
+                            indigo.dimmer.setBrightness(did, value=orig_brightness[i])
                     else:
-                        if original_state['on']:
-                            indigo.device.turnOn(dev.id)
-                        else:
-                            indigo.device.turnOff(dev.id)
-                
+                        if dev.onState != orig_on[i]:
+                            if orig_on[i]:
+                                indigo.device.turnOn(did)
+                            else:
+                                indigo.device.turnOff(did)
+
                 except Exception as e:
-                    self.logger.error(f"Error in final restore for device {dev_id}: {e}")
+                    self.logger.error("Error in final restore for device %s: %s", did, e)
             
         finally:
-            # Remove devices from flashing set and clean up this thread from tracking
+            # Remove devices from flashing set (set.discard is GIL-atomic, same
+            # as the add above) and clean up this thread from tracking - only
+            # the paired dict removal needs the lock
+            for dev_id in device_ids:
+                self.flashing_devices.discard(dev_id)
             with self.flash_lock:
-                for dev_id in device_ids:
-                    self.flashing_devices.discard(int(dev_id))
                 if thread_id in self.flash_threads:
                     del self.flash_threads[thread_id]
                 if thread_id in self.flash_stop_events:
@@ -271,36 +708,16 @@ class Plugin(indigo.PluginBase):
     def flashLamps(self, pluginAction):
         """Action handler for flashing lamps"""
         try:
-            # Extract parameters
-            device_ids = pluginAction.props.get("deviceList", [])
-            if not device_ids:
-                self.logger.error("No devices selected for flashing")
-                return
-            
-            # Handle Indigo.List objects - convert to regular list
-            if hasattr(device_ids, '__iter__') and not isinstance(device_ids, str):
-                device_ids = list(device_ids)
-            
-            # Ensure device_ids is a list
-            if not isinstance(device_ids, list):
-                device_ids = [device_ids]
-            
-            # Convert any nested lists or ensure all items are strings
-            cleaned_device_ids = []
-            for dev_id in device_ids:
-                if isinstance(dev_id, list):
-                    # If it's a list, take the first item
-                    cleaned_device_ids.append(str(dev_id[0]) if dev_id else "")
-                else:
-                    cleaned_device_ids.append(str(dev_id))
-            
-            device_ids = [d for d in cleaned_device_ids if d]  # Remove empty strings
-            
+            # Extract parameters - ids are ints from here on
+            device_ids = self._coerce_ids(pluginAction.props.get("deviceList", []))
             if not device_ids:
                 self.logger.error("No valid devices selected for flashing")
                 return
             
-            flash_count = int(pluginAction.props.get("flashCount", 3))
+            flash_count = _safe_int(pluginAction.props.get("flashCount", 3))
+            if flash_count is None:
+                self.logger.error("Flash count must be a number")
+                return
             flash_duration = float(pluginAction.props.get("flashDuration", 0.5))
             gap_duration = float(pluginAction.props.get("gapDuration", 0.5))
             
@@ -309,8 +726,8 @@ class Plugin(indigo.PluginBase):
             flash_to_minimum_str = pluginAction.props.get("flashToMinimum", "").strip()
             
             # Only convert to int if the string is not empty
-            flash_to_brightness = int(flash_to_brightness_str) if flash_to_brightness_str else None
-            flash_to_minimum = int(flash_to_minimum_str) if flash_to_minimum_str else None
+            flash_to_brightness = _safe_int(flash_to_brightness_str) if flash_to_brightness_str else None
+            flash_to_minimum = _safe_int(flash_to_minimum_str) if flash_to_minimum_str else None
             
             # Validate values
             if flash_to_brightness is not None:
@@ -326,32 +743,31 @@ class Plugin(indigo.PluginBase):
                 self.logger.error("Flash and gap duration must be positive")
                 return
             
-            # Create unique thread ID
-            thread_id = f"flash_{time.time()}"
+            # Create unique thread ID - a monotonically increasing int; the old
+            # time.time()-based key could collide on rapid back-to-back actions
+            thread_id = next(self._flash_id_counter)
             
             # Create stop event for this thread
             stop_event = threading.Event()
             
-            # Start flash thread
+            # Hand the sequence to the persistent worker pool
             with self.flash_lock:
                 self.flash_stop_events[thread_id] = stop_event
-                flash_thread = threading.Thread(
-                    target=self._flash_device_thread,
-                    args=(thread_id, device_ids, flash_count, flash_duration, gap_duration,
-                          flash_to_brightness, flash_to_minimum)
-                )
-                flash_thread.daemon = True
-                self.flash_threads[thread_id] = flash_thread
-                flash_thread.start()
-            
-            device_names = [indigo.devices[int(dev_id)].name for dev_id in device_ids]
-            self.logger.info(f"Started flashing {len(device_ids)} device(s): {', '.join(device_names)} "
-                            f"({flash_count} flashes, {flash_duration}s duration, {gap_duration}s gap)")
+                self.flash_threads[thread_id] = self._flash_executor.submit(
+                    self._flash_device_thread,
+                    thread_id, device_ids, flash_count, flash_duration, gap_duration,
+                    flash_to_brightness, flash_to_minimum)
+            
+            # Resolving every device name is only worth doing if the message
+            # will actually be emitted
+            if self.logger.isEnabledFor(logging.INFO):
+                device_names = [indigo.devices[dev_id].name for dev_id in device_ids]
+                self.logger.info("Started flashing %s device(s): %s (%s flashes, %ss duration, %ss gap)",
+                                 len(device_ids), ', '.join(device_names),
+                                 flash_count, flash_duration, gap_duration)
         
-        except Exception as e:
-            self.logger.error(f"Error in flashLamps: {e}")
-            import traceback
-            self.logger.error(traceback.format_exc())
+        except Exception:
+            self.logger.exception("Error in flashLamps")
     
     def cancelAllFlashes(self, pluginAction):
         """Action handler to cancel all running flash sequences"""
@@ -366,10 +782,10 @@ class Plugin(indigo.PluginBase):
                 for stop_event in self.flash_stop_events.values():
                     stop_event.set()
             
-            self.logger.info(f"Cancelled {count} flash sequence(s)")
+            self.logger.info("Cancelled %s flash sequence(s)", count)
         
         except Exception as e:
-            self.logger.error(f"Error in cancelAllFlashes: {e}")
+            self.logger.error("Error in cancelAllFlashes: %s", e)
     
     ########################################
     # Scene Device Methods
@@ -378,97 +794,55 @@ class Plugin(indigo.PluginBase):
     def getSceneDeviceList(self, filter="", valuesDict=None, typeId="", targetId=0):
         """Get list of all controllable devices for scene control"""
         try:
-            items = []
-            
-            for dev in indigo.devices:
-                include = False
-                
-                if hasattr(dev, '__class__'):
-                    class_name = dev.__class__.__name__
-                    # Include native Indigo device types
-                    if class_name in ['DimmerDevice', 'RelayDevice', 'ThermostatDevice', 'SpeedControlDevice']:
-                        include = True
-                
-                # Also check for plugin-based speed control devices (like fans)
-                if not include:
-                    if hasattr(dev, 'speedIndex') or hasattr(dev, 'speedLevel'):
-                        include = True
-                
-                if include:
-                    items.append((str(dev.id), dev.name))
-            
+            items = self._get_device_buckets()['SceneControllable']
+
             if not items:
-                items.append(("", "-- No controllable devices found --"))
-            return sorted(items, key=lambda x: x[1])
+                return [("", "-- No controllable devices found --")]
+            return items
         except Exception as e:
             self.logger.error(f"Error in getSceneDeviceList: {e}")
             return [("", "-- Error loading devices --")]
-        """Get list of dimmer devices for scene control"""
-        try:
-            items = []
-            for dev in indigo.devices:
-                if hasattr(dev, '__class__') and dev.__class__.__name__ == 'DimmerDevice':
-                    items.append((str(dev.id), dev.name))
-            if not items:
-                items.append(("", "-- No dimmers found --"))
-            return sorted(items, key=lambda x: x[1])
-        except Exception as e:
-            self.logger.error(f"Error in getSceneDimmerList: {e}")
-            return [("", "-- Error loading dimmers --")]
-    
+
     def getSceneRelayList(self, filter="", valuesDict=None, typeId="", targetId=0):
         """Get list of relay devices for scene control"""
         try:
-            items = []
-            for dev in indigo.devices:
-                if hasattr(dev, '__class__') and dev.__class__.__name__ == 'RelayDevice':
-                    items.append((str(dev.id), dev.name))
+            items = self._get_device_buckets()['RelayDevice']
             if not items:
-                items.append(("", "-- No relays found --"))
-            return sorted(items, key=lambda x: x[1])
+                return [("", "-- No relays found --")]
+            return items
         except Exception as e:
             self.logger.error(f"Error in getSceneRelayList: {e}")
             return [("", "-- Error loading relays --")]
-    
+
     def getSceneThermostatList(self, filter="", valuesDict=None, typeId="", targetId=0):
         """Get list of thermostat devices for scene control"""
         try:
-            items = []
-            for dev in indigo.devices:
-                if hasattr(dev, '__class__') and dev.__class__.__name__ == 'ThermostatDevice':
-                    items.append((str(dev.id), dev.name))
+            items = self._get_device_buckets()['ThermostatDevice']
             if not items:
-                items.append(("", "-- No thermostats found --"))
-            return sorted(items, key=lambda x: x[1])
+                return [("", "-- No thermostats found --")]
+            return items
         except Exception as e:
             self.logger.error(f"Error in getSceneThermostatList: {e}")
             return [("", "-- Error loading thermostats --")]
-    
+
     def getSceneFanList(self, filter="", valuesDict=None, typeId="", targetId=0):
         """Get list of fan devices for scene control"""
         try:
-            items = []
-            for dev in indigo.devices:
-                if hasattr(dev, '__class__') and dev.__class__.__name__ == 'SpeedControlDevice':
-                    items.append((str(dev.id), dev.name))
+            items = self._get_device_buckets()['SpeedControlDevice']
             if not items:
-                items.append(("", "-- No fans found --"))
-            return sorted(items, key=lambda x: x[1])
+                return [("", "-- No fans found --")]
+            return items
         except Exception as e:
             self.logger.error(f"Error in getSceneFanList: {e}")
             return [("", "-- Error loading fans --")]
-    
+
     def getSceneBlindList(self, filter="", valuesDict=None, typeId="", targetId=0):
         """Get list of blind/shade devices for scene control"""
         try:
-            items = []
-            for dev in indigo.devices:
-                # Blinds typically have a position state
-                if 'position' in [state.lower() for state in dev.states.keys()]:
-                    items.append((str(dev.id), dev.name))
+            items = self._get_device_buckets()['Blind']
             if not items:
-                items.append(("", "-- No blinds found --"))
-            return sorted(items, key=lambda x: x[1])
+                return [("", "-- No blinds found --")]
+            return items
         except Exception as e:
             self.logger.error(f"Error in getSceneBlindList: {e}")
             return [("", "-- Error loading blinds --")]
@@ -479,7 +853,7 @@ class Plugin(indigo.PluginBase):
             items = [("none", "-- None --")]
             for ag in indigo.actionGroups:
                 items.append((str(ag.id), ag.name))
-            return sorted(items, key=lambda x: x[1])
+            return sorted(items, key=operator.itemgetter(1))
         except Exception as e:
             self.logger.error(f"Error in getActionGroupList: {e}")
             return [("none", "-- Error loading action groups --")]
@@ -491,13 +865,10 @@ class Plugin(indigo.PluginBase):
     def getRelayList(self, filter="", valuesDict=None, typeId="", targetId=0):
         """Get list of relay devices"""
         try:
-            items = []
-            for dev in indigo.devices:
-                if hasattr(dev, '__class__') and dev.__class__.__name__ == 'RelayDevice':
-                    items.append((str(dev.id), dev.name))
+            items = self._get_device_buckets()['RelayDevice']
             if not items:
-                items.append(("0", "-- No relays found --"))
-            return sorted(items, key=lambda x: x[1])
+                return [("0", "-- No relays found --")]
+            return items
         except Exception as e:
             self.logger.error(f"Error in getRelayList: {e}")
             return [("0", "-- Error loading relays --")]
@@ -505,112 +876,120 @@ class Plugin(indigo.PluginBase):
     def _get_relay_states(self, relay1_id, relay2_id):
         """Get the on/off states of both relays"""
         try:
-            relay1 = indigo.devices[int(relay1_id)]
-            relay2 = indigo.devices[int(relay2_id)]
-            return relay1.onState, relay2.onState
+            devices = indigo.devices
+            return devices[relay1_id].onState, devices[relay2_id].onState
         except Exception as e:
             self.logger.error(f"Error getting relay states: {e}")
             return False, False
     
     def _relay_states_to_level(self, relay1_on, relay2_on):
         """Convert relay states to dimmer/fan level (0, 33, 66, 100)"""
-        if not relay1_on and not relay2_on:
-            return 0
-        elif relay1_on and not relay2_on:
-            return 33
-        elif not relay1_on and relay2_on:
-            return 66
-        else:  # both on
-            return 100
+        return _STATES_TO_LEVEL[bool(relay1_on) + 2 * bool(relay2_on)]
     
     def _level_to_relay_states(self, level):
         """Convert dimmer/fan level to relay states, rounding to nearest valid level"""
-        # Round to nearest valid level
-        if level <= 16:
-            rounded_level = 0
-        elif level <= 49:
-            rounded_level = 33
-        elif level <= 83:
-            rounded_level = 66
-        else:
-            rounded_level = 100
-        
-        # Convert to relay states
-        if rounded_level == 0:
-            return False, False
-        elif rounded_level == 33:
-            return True, False
-        elif rounded_level == 66:
-            return False, True
-        else:  # 100
-            return True, True
+        return _LEVEL_TO_STATES[max(0, min(100, int(level)))]
     
     def _apply_relay_states(self, relay1_id, relay2_id, relay1_should_be_on, relay2_should_be_on):
-        """Apply the relay states"""
+        """Apply the relay states, skipping relays already in the target state"""
         try:
-            relay1_id = int(relay1_id)
-            relay2_id = int(relay2_id)
-            
-            # Apply both relay states
-            if relay1_should_be_on:
-                indigo.device.turnOn(relay1_id)
-            else:
-                indigo.device.turnOff(relay1_id)
-            
-            if relay2_should_be_on:
-                indigo.device.turnOn(relay2_id)
-            else:
-                indigo.device.turnOff(relay2_id)
-        
+            for relay_id, should_be_on in ((relay1_id, relay1_should_be_on),
+                                           (relay2_id, relay2_should_be_on)):
+                # Skip the command entirely if the relay is already where we want it -
+                # each turnOn/turnOff is a round-trip to the Indigo server
+                if indigo.devices[relay_id].onState == should_be_on:
+                    continue
+
+                if should_be_on:
+                    indigo.device.turnOn(relay_id)
+                else:
+                    indigo.device.turnOff(relay_id)
+
         except Exception as e:
             self.logger.error(f"Error applying relay states: {e}")
-    
+
+    def _get_relay2_config(self, dev):
+        """Return the (relay1_id, relay2_id) pair for a Relay2 device.
+
+        dev.pluginProps materializes a fresh dict on every access, so read
+        it once per device and cache the pair. Entries are dropped when the
+        device stops or its config dialog is re-validated.
+        """
+        config = self._relay2_config.get(dev.id)
+        if config is None:
+            props = dev.pluginProps
+            # Store int ids so downstream code never re-converts or compares strings
+            config = (_safe_int(props.get("relay1Device")),
+                      _safe_int(props.get("relay2Device")))
+            self._relay2_config[dev.id] = config
+        return config
+
+    def _schedule_relay_apply(self, dev_id, relay1_id, relay2_id, relay1_on, relay2_on, delay=1.0):
+        """Queue a delayed relay write for a Relay2 device, coalescing bursts.
+
+        Rapid-fire actions (e.g. a brightness ramp) overwrite the pending
+        entry for their device, so only the final requested state is sent
+        to the relays once the delay elapses - instead of one sleeping
+        thread per action all racing to write.
+        """
+        with self._relay2_lock:
+            self._pending_relay2[dev_id] = (relay1_id, relay2_id, relay1_on, relay2_on,
+                                            time.monotonic() + delay)
+            if self._relay2_worker is None or not self._relay2_worker.is_alive():
+                self._relay2_worker = threading.Thread(
+                    target=self._relay2_worker_loop, name='relay2-apply', daemon=True)
+                self._relay2_worker.start()
+        self._relay2_event.set()
+
+    def _relay2_worker_loop(self):
+        """Single worker that applies pending relay writes as they come due"""
+        while True:
+            self._relay2_event.clear()
+            now = time.monotonic()
+            due = []
+            next_due = None
+            with self._relay2_lock:
+                for dev_id, entry in list(self._pending_relay2.items()):
+                    if entry[4] <= now:
+                        due.append(entry)
+                        del self._pending_relay2[dev_id]
+                    elif next_due is None or entry[4] < next_due:
+                        next_due = entry[4]
+            for relay1_id, relay2_id, relay1_on, relay2_on, _ in due:
+                self._apply_relay_states(relay1_id, relay2_id, relay1_on, relay2_on)
+            if next_due is None:
+                # Idle - block until new work is scheduled
+                self._relay2_event.wait()
+            else:
+                self._relay2_event.wait(max(0.0, next_due - time.monotonic()))
+
     def _get_device_scene_state(self, dev):
         """Get the controllable state of a device for scene comparison"""
-        state = {}
-        
-        if hasattr(dev, '__class__'):
-            class_name = dev.__class__.__name__
-            
-            if class_name == 'DimmerDevice':
-                state['type'] = 'dimmer'
-                state['brightness'] = dev.brightness
-                state['onState'] = dev.onState
-                
-            elif class_name == 'RelayDevice':
-                state['type'] = 'relay'
-                state['onState'] = dev.onState
-                
-            elif class_name == 'ThermostatDevice':
-                state['type'] = 'thermostat'
-                # Convert enum values to their integer equivalents for storage
-                state['hvacMode'] = int(dev.hvacMode)
-                state['fanMode'] = int(dev.fanMode)
-                state['coolSetpoint'] = float(dev.coolSetpoint)
-                state['heatSetpoint'] = float(dev.heatSetpoint)
-                
-            elif class_name == 'SpeedControlDevice':
-                state['type'] = 'fan'
-                state['speedLevel'] = dev.speedLevel if hasattr(dev, 'speedLevel') else 0
-                state['onState'] = dev.onState
-                
-            else:
-                # Check if it's a blind/shade by looking for position
-                if 'position' in [s.lower() for s in dev.states.keys()]:
-                    state['type'] = 'blind'
-                    # Find the actual position state key
-                    for key in dev.states.keys():
-                        if key.lower() == 'position':
-                            state['position'] = dev.states[key]
-                            break
-        
-        return state
-    
+        extractor = _STATE_EXTRACTORS.get(type(dev).__name__, _extract_blind_state)
+        return extractor(dev)
+
+    def _parse_saved_states(self, saved_states_str):
+        """Parse a savedStates blob into {'d': [(dev_id, expected_tuple)], 'v': [(var_id, value)]}.
+
+        The expected tuple is the same canonical (type, *fields) shape the
+        extractors produce, so a scene check compares each device with one
+        tuple equality. Scenes saved by older plugin versions stored a flat
+        dict keyed by 'device_<id>'/'variable_<id>' strings; upgrade those
+        in memory so the rest of the code only ever sees one shape.
+        """
+        saved_states = json.loads(saved_states_str)
+        if 'd' not in saved_states and 'v' not in saved_states:
+            saved_states = _upgrade_saved_states(saved_states)
+        return {
+            'd': [(entry[0], tuple(entry[1:])) for entry in saved_states.get('d', ())],
+            'v': [(entry[0], entry[1]) for entry in saved_states.get('v', ())],
+        }
+
     def saveSceneState(self, valuesDict, typeId="", devId=0):
         """Button callback to save current state of all selected devices and variables"""
         try:
-            saved_states = {}
-            
+            saved_states = {'d': [], 'v': []}
+
             # Get the single list of selected devices
             device_list = valuesDict.get('sceneDevices', [])
             
@@ -618,87 +997,66 @@ class Plugin(indigo.PluginBase):
             self.logger.info("Saving Scene State:")
             
             # Handle devices
-            if device_list:
-                # Handle Indigo.List objects
-                if hasattr(device_list, '__iter__') and not isinstance(device_list, str):
-                    device_list = list(device_list)
-                
-                if not isinstance(device_list, list):
-                    device_list = [device_list]
-                
-                for dev_id in device_list:
-                    if isinstance(dev_id, list):
-                        dev_id = dev_id[0] if dev_id else None
-                    
-                    if not dev_id or dev_id == "":
-                        continue
-                    
-                    try:
-                        dev = indigo.devices[int(dev_id)]
-                        state = self._get_device_scene_state(dev)
-                        
-                        if state:
-                            saved_states[f"device_{dev_id}"] = state
-                            
-                            # Log the saved state
-                            if state['type'] == 'dimmer':
-                                self.logger.info(f"  Device: {dev.name}: Brightness={state['brightness']}%")
-                            elif state['type'] == 'relay':
-                                self.logger.info(f"  Device: {dev.name}: {'ON' if state['onState'] else 'OFF'}")
-                            elif state['type'] == 'thermostat':
-                                hvac_mode_name = str(dev.hvacMode).split('.')[-1] if hasattr(dev.hvacMode, '__class__') else str(state['hvacMode'])
-                                fan_mode_name = str(dev.fanMode).split('.')[-1] if hasattr(dev.fanMode, '__class__') else str(state['fanMode'])
-                                self.logger.info(f"  Device: {dev.name}: Mode={hvac_mode_name}, Heat={state['heatSetpoint']}°, Cool={state['coolSetpoint']}°, Fan={fan_mode_name}")
-                            elif state['type'] == 'fan':
-                                self.logger.info(f"  Device: {dev.name}: Speed={state['speedLevel']}")
-                            elif state['type'] == 'blind':
-                                self.logger.info(f"  Device: {dev.name}: Position={state['position']}%")
+            for dev_id in self._coerce_ids(device_list):
+                try:
+                    dev = indigo.devices[dev_id]
+                    state = self._get_device_scene_state(dev)
                     
-                    except Exception as e:
-                        self.logger.error(f"Error saving state for device {dev_id}: {e}")
+                    if state:
+                        state_type = state[0]
+                        saved_states['d'].append([dev_id, *state])
+
+                        # Log the saved state
+                        fields = dict(zip(_SCENE_FIELDS[state_type], state[1:]))
+                        if state_type == 'dimmer':
+                            self.logger.info("  Device: %s: Brightness=%s%%", dev.name, fields['brightness'])
+                        elif state_type == 'relay':
+                            self.logger.info("  Device: %s: %s", dev.name, 'ON' if fields['onState'] else 'OFF')
+                        elif state_type == 'thermostat':
+                            hvac_mode_name = str(dev.hvacMode).split('.')[-1] if hasattr(dev.hvacMode, '__class__') else str(fields['hvacMode'])
+                            fan_mode_name = str(dev.fanMode).split('.')[-1] if hasattr(dev.fanMode, '__class__') else str(fields['fanMode'])
+                            self.logger.info("  Device: %s: Mode=%s, Heat=%s°, Cool=%s°, Fan=%s", dev.name,
+                                             hvac_mode_name, fields['heatSetpoint'], fields['coolSetpoint'], fan_mode_name)
+                        elif state_type == 'fan':
+                            self.logger.info("  Device: %s: Speed=%s", dev.name, fields['speedLevel'])
+                        elif state_type == 'blind':
+                            self.logger.info("  Device: %s: Position=%s%%", dev.name, fields['position'])
+                
+                except Exception as e:
+                    self.logger.error("Error saving state for device %s: %s", dev_id, e)
             
             # Handle variables
             variable_list = valuesDict.get('sceneVariables', [])
-            self.logger.info(f"DEBUG: variable_list raw = {variable_list}")
-            
-            if variable_list:
-                # Handle Indigo.List objects
-                if hasattr(variable_list, '__iter__') and not isinstance(variable_list, str):
-                    variable_list = list(variable_list)
-                
-                if not isinstance(variable_list, list):
-                    variable_list = [variable_list]
-                
-                for var_id in variable_list:
-                    if isinstance(var_id, list):
-                        var_id = var_id[0] if var_id else None
-                    
-                    if not var_id or var_id == "":
-                        continue
-                    
-                    try:
-                        var = indigo.variables[int(var_id)]
-                        saved_states[f"variable_{var_id}"] = {
-                            'type': 'variable',
-                            'value': var.value
-                        }
-                        self.logger.info(f"  Variable: {var.name}: {var.value}")
-                    
-                    except Exception as e:
-                        self.logger.error(f"Error saving state for variable {var_id}: {e}")
+            if self.debug:
+                self.logger.debug("variable_list raw = %s", variable_list)
             
-            if saved_states:
-                valuesDict['savedStates'] = json.dumps(saved_states)
-                self.logger.info(f"Scene state saved successfully ({len(saved_states)} items)")
+            for var_id in self._coerce_ids(variable_list):
+                try:
+                    var = indigo.variables[var_id]
+                    # Normalize to str once here so the scene check can
+                    # compare against var.value without coercing per call
+                    saved_states['v'].append([var_id, str(var.value)])
+                    self.logger.info("  Variable: %s: %s", var.name, var.value)
+
+                except Exception as e:
+                    self.logger.error("Error saving state for variable %s: %s", var_id, e)
+
+            item_count = len(saved_states['d']) + len(saved_states['v'])
+            if item_count:
+                # Compact separators - the blob lives in pluginProps, gets
+                # persisted by Indigo, and is re-read on every cold check
+                valuesDict['savedStates'] = json.dumps(
+                    saved_states, separators=(',', ':'), ensure_ascii=False)
+                # Drop the in-memory copy so the next check re-parses the new blob
+                self._forget_scene(devId)
+                self.logger.info("Scene state saved successfully (%s items)", item_count)
             else:
                 self.logger.warning("No devices or variables selected - no state saved")
             
             self.logger.info("=" * 60)
             
-        except Exception as e:
-            self.logger.error(f"Error in saveSceneState: {e}")
-            import traceback
-            self.logger.error(traceback.format_exc())
+        except Exception:
+            self.logger.exception("Error in saveSceneState")
         
         return valuesDict
     
@@ -711,91 +1069,65 @@ class Plugin(indigo.PluginBase):
                 return valuesDict
             
             # Parse saved states
-            saved_states = json.loads(saved_states_str)
-            
+            saved_states = self._parse_saved_states(saved_states_str)
+
             self.logger.info("=" * 60)
             self.logger.info("Scene State Comparison:")
             self.logger.info("")
-            
+
             all_match = True
-            
-            for item_key, saved_state in saved_states.items():
+            devices = indigo.devices
+            variables = indigo.variables
+            log_info = self.logger.info
+
+            for dev_id, expected in saved_states.get('d', []):
+                state_type = expected[0]
                 try:
-                    # Check if it's a device or variable
-                    if item_key.startswith('device_'):
-                        dev_id_str = item_key.replace('device_', '')
-                        dev = indigo.devices[int(dev_id_str)]
-                        current_state = self._get_device_scene_state(dev)
-                        
-                        device_matches = True
-                        differences = []
-                        
-                        if saved_state['type'] != current_state.get('type'):
-                            differences.append(f"Type mismatch: saved={saved_state['type']}, current={current_state.get('type')}")
-                            device_matches = False
-                        
-                        elif saved_state['type'] == 'dimmer':
-                            if saved_state['brightness'] != current_state['brightness']:
-                                differences.append(f"Brightness: saved={saved_state['brightness']}%, current={current_state['brightness']}%")
-                                device_matches = False
-                            if saved_state['onState'] != current_state['onState']:
-                                differences.append(f"OnState: saved={saved_state['onState']}, current={current_state['onState']}")
-                                device_matches = False
-                        
-                        elif saved_state['type'] == 'relay':
-                            if saved_state['onState'] != current_state['onState']:
-                                differences.append(f"OnState: saved={saved_state['onState']}, current={current_state['onState']}")
-                                device_matches = False
-                        
-                        elif saved_state['type'] == 'thermostat':
-                            if saved_state['hvacMode'] != int(current_state['hvacMode']):
-                                differences.append(f"HVAC Mode: saved={saved_state['hvacMode']}, current={int(current_state['hvacMode'])}")
-                                device_matches = False
-                            if saved_state['fanMode'] != int(current_state['fanMode']):
-                                differences.append(f"Fan Mode: saved={saved_state['fanMode']}, current={int(current_state['fanMode'])}")
-                                device_matches = False
-                            if saved_state['coolSetpoint'] != float(current_state['coolSetpoint']):
-                                differences.append(f"Cool Setpoint: saved={saved_state['coolSetpoint']}°, current={float(current_state['coolSetpoint'])}°")
-                                device_matches = False
-                            if saved_state['heatSetpoint'] != float(current_state['heatSetpoint']):
-                                differences.append(f"Heat Setpoint: saved={saved_state['heatSetpoint']}°, current={float(current_state['heatSetpoint'])}°")
-                                device_matches = False
-                        
-                        elif saved_state['type'] == 'fan':
-                            if saved_state['speedLevel'] != current_state['speedLevel']:
-                                differences.append(f"Speed Level: saved={saved_state['speedLevel']}, current={current_state['speedLevel']}")
-                                device_matches = False
-                            if saved_state['onState'] != current_state['onState']:
-                                differences.append(f"OnState: saved={saved_state['onState']}, current={current_state['onState']}")
-                                device_matches = False
-                        
-                        elif saved_state['type'] == 'blind':
-                            if saved_state['position'] != current_state.get('position'):
-                                differences.append(f"Position: saved={saved_state['position']}%, current={current_state.get('position')}%")
-                                device_matches = False
-                        
-                        if device_matches:
-                            self.logger.info(f"✓ Device: {dev.name}: MATCHES")
-                        else:
-                            self.logger.info(f"✗ Device: {dev.name}: DIFFERS")
-                            for diff in differences:
-                                self.logger.info(f"    - {diff}")
-                            all_match = False
-                    
-                    elif item_key.startswith('variable_'):
-                        var_id_str = item_key.replace('variable_', '')
-                        var = indigo.variables[int(var_id_str)]
-                        current_value = var.value
-                        
-                        if saved_state['value'] == current_value:
-                            self.logger.info(f"✓ Variable: {var.name}: MATCHES (value: {current_value})")
-                        else:
-                            self.logger.info(f"✗ Variable: {var.name}: DIFFERS")
-                            self.logger.info(f"    - Value: saved='{saved_state['value']}', current='{current_value}'")
-                            all_match = False
-                
-                except Exception as e:
-                    self.logger.error(f"Error comparing item {item_key}: {e}")
+                    dev = devices[dev_id]
+                    current = self._get_device_scene_state(dev)
+
+                    device_matches = True
+                    differences = []
+
+                    if not current or current[0] != state_type:
+                        differences.append(f"Type mismatch: saved={state_type}, current={current[0] if current else None}")
+                        device_matches = False
+
+                    elif expected != current:
+                        # Same shape, different values - report field by field
+                        for field, saved_value, current_value in zip(
+                                _SCENE_FIELDS[state_type], expected[1:], current[1:]):
+                            if saved_value != current_value:
+                                label, unit = _SCENE_FIELD_LABELS[field]
+                                differences.append(f"{label}: saved={saved_value}{unit}, current={current_value}{unit}")
+                        device_matches = False
+
+                    if device_matches:
+                        log_info("✓ Device: %s: MATCHES", dev.name)
+                    else:
+                        log_info("✗ Device: %s: DIFFERS", dev.name)
+                        for diff in differences:
+                            log_info("    - %s", diff)
+                        all_match = False
+
+                except Exception as e:
+                    self.logger.error("Error comparing device %s: %s", dev_id, e)
+                    all_match = False
+
+            for var_id, saved_value in saved_states.get('v', []):
+                try:
+                    var = variables[var_id]
+                    current_value = var.value
+
+                    if saved_value == current_value:
+                        log_info("✓ Variable: %s: MATCHES (value: %s)", var.name, current_value)
+                    else:
+                        log_info("✗ Variable: %s: DIFFERS", var.name)
+                        log_info("    - Value: saved='%s', current='%s'", saved_value, current_value)
+                        all_match = False
+
+                except Exception as e:
+                    self.logger.error("Error comparing variable %s: %s", var_id, e)
                     all_match = False
             
             self.logger.info("")
@@ -805,83 +1137,128 @@ class Plugin(indigo.PluginBase):
                 self.logger.info("Result: DIFFERENCES FOUND - Scene should be OFF")
             self.logger.info("=" * 60)
         
-        except Exception as e:
-            self.logger.error(f"Error in compareSceneState: {e}")
-            import traceback
-            self.logger.error(traceback.format_exc())
+        except Exception:
+            self.logger.exception("Error in compareSceneState")
         
         return valuesDict
     
-    def _check_scene_match(self, scene_dev):
-        """Check if all monitored devices match the saved scene state"""
-        try:
+    def _get_scene_states(self, scene_dev):
+        """Return the parsed saved state for a scene, served from memory.
+
+        Once warm, scene checks never touch pluginProps or JSON - the
+        parsed form lives here until the device stops or its config is
+        revalidated. Returns None when nothing has been saved or the
+        stored blob is corrupt.
+        """
+        saved_states = self._scene_state.get(scene_dev.id)
+        if saved_states is None:
             saved_states_str = scene_dev.pluginProps.get('savedStates', '')
             if not saved_states_str:
-                return False
-            
-            # Parse saved states from JSON
+                return None
             try:
-                saved_states = json.loads(saved_states_str)
-            except (json.JSONDecodeError, ValueError) as e:
+                saved_states = self._parse_saved_states(saved_states_str)
+            except (json.JSONDecodeError, ValueError):
                 self.logger.error(f"Scene '{scene_dev.name}': Invalid saved state data. Please save the scene state again.")
+                return None
+            self._register_scene(scene_dev.id, saved_states)
+        return saved_states
+
+    def _register_scene(self, scene_id, saved_states):
+        """Store a scene's parsed state and index its monitored members"""
+        self._scene_state[scene_id] = saved_states
+        for dev_id, _ in saved_states['d']:
+            self._scene_members.setdefault(dev_id, set()).add(scene_id)
+        for var_id, _ in saved_states['v']:
+            self._scene_var_members.setdefault(var_id, set()).add(scene_id)
+        # Force a full compare before the result cache is trusted
+        self._dirty_scenes.add(scene_id)
+        self._scene_match_cache.pop(scene_id, None)
+
+    def _forget_scene(self, scene_id):
+        """Drop a scene's parsed state, cached result, and index entries"""
+        self._scene_state.pop(scene_id, None)
+        self._scene_match_cache.pop(scene_id, None)
+        self._dirty_scenes.discard(scene_id)
+        self._scene_recheck_due.pop(scene_id, None)
+        for index in (self._scene_members, self._scene_var_members):
+            for members in index.values():
+                members.discard(scene_id)
+
+    def _check_scene_match(self, scene_dev, snapshot=None):
+        """Check if all monitored devices match the saved scene state.
+
+        Steady-state calls (the common case - the poll loop asks every
+        second) are answered from the cached result of the last full
+        compare; the field-by-field compare only reruns after a monitored
+        device or variable changed, which deviceUpdated/variableUpdated
+        record through the member indexes. A snapshot dict shared across
+        one poll tick lets scenes with overlapping members reuse each
+        member's extracted state instead of re-reading it per scene.
+        """
+        sid = scene_dev.id
+        cached = self._scene_match_cache.get(sid)
+        if sid not in self._dirty_scenes:
+            if cached is not None:
+                return cached
+        elif cached is not None and time.monotonic() < self._scene_recheck_due.get(sid, 0.0):
+            # Mid-burst: keep the previous answer until the members settle,
+            # so applying a scene flips onOffState once, not once per relay
+            return cached
+        matches = self._compare_scene_to_saved(scene_dev, snapshot)
+        self._scene_match_cache[sid] = matches
+        self._dirty_scenes.discard(sid)
+        self._scene_recheck_due.pop(sid, None)
+        return matches
+
+    def _compare_scene_to_saved(self, scene_dev, snapshot=None):
+        """Full field-by-field compare of current states against the scene"""
+        try:
+            saved_states = self._get_scene_states(scene_dev)
+            if saved_states is None:
                 return False
-            
-            # Check each item (device or variable)
-            for item_key, saved_state in saved_states.items():
-                if item_key.startswith('device_'):
-                    dev_id_str = item_key.replace('device_', '')
+
+            # Bind the accessors once - each indigo.devices[...] is an
+            # attribute chain we'd otherwise re-resolve per monitored item
+            devices = indigo.devices
+            variables = indigo.variables
+
+            # The extractors return the same canonical (type, *fields) tuple
+            # stored at save time, so each device is one tuple equality.
+            # Extracted states are memoized in the shared snapshot so other
+            # scenes checked this tick skip the fetch for common members
+            for dev_id, expected in saved_states.get('d', ()):
+                if snapshot is not None and dev_id in snapshot:
+                    current = snapshot[dev_id]
+                else:
                     try:
-                        dev = indigo.devices[int(dev_id_str)]
+                        dev = devices[dev_id]
                     except:
-                        self.logger.warning(f"Scene '{scene_dev.name}': Monitored device ID {dev_id_str} no longer exists. Please reconfigure the scene.")
+                        self.logger.warning("Scene '%s': Monitored device ID %s no longer exists. Please reconfigure the scene.",
+                                            scene_dev.name, dev_id)
                         return False
-                    
-                    current_state = self._get_device_scene_state(dev)
-                    
-                    # Compare states based on device type
-                    if saved_state['type'] != current_state.get('type'):
-                        return False
-                    
-                    if saved_state['type'] == 'dimmer':
-                        if saved_state['brightness'] != current_state['brightness']:
-                            return False
-                        if saved_state['onState'] != current_state['onState']:
-                            return False
-                            
-                    elif saved_state['type'] == 'relay':
-                        if saved_state['onState'] != current_state['onState']:
-                            return False
-                            
-                    elif saved_state['type'] == 'thermostat':
-                        if (saved_state['hvacMode'] != int(current_state['hvacMode']) or
-                            saved_state['fanMode'] != int(current_state['fanMode']) or
-                            saved_state['coolSetpoint'] != float(current_state['coolSetpoint']) or
-                            saved_state['heatSetpoint'] != float(current_state['heatSetpoint'])):
-                            return False
-                            
-                    elif saved_state['type'] == 'fan':
-                        if saved_state['speedLevel'] != current_state['speedLevel']:
-                            return False
-                        if saved_state['onState'] != current_state['onState']:
-                            return False
-                            
-                    elif saved_state['type'] == 'blind':
-                        if saved_state['position'] != current_state.get('position'):
-                            return False
-                
-                elif item_key.startswith('variable_'):
-                    var_id_str = item_key.replace('variable_', '')
-                    try:
-                        var = indigo.variables[int(var_id_str)]
-                        current_value = str(var.value)
-                        saved_value = str(saved_state['value'])
-                        self.logger.debug(f"Checking variable '{var.name}': saved='{saved_value}', current='{current_value}'")
-                        if saved_value != current_value:
-                            return False
-                    except:
-                        self.logger.warning(f"Scene '{scene_dev.name}': Monitored variable ID {var_id_str} no longer exists. Please reconfigure the scene.")
+                    current = self._get_device_scene_state(dev)
+                    if snapshot is not None:
+                        snapshot[dev_id] = current
+
+                if current != expected:
+                    return False
+
+            # Values are stored as canonical strings at save time, and
+            # Indigo variable values are always strings - compare directly
+            debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+            for var_id, saved_value in saved_states.get('v', ()):
+                try:
+                    var = variables[var_id]
+                    if debug_enabled:
+                        self.logger.debug("Checking variable '%s': saved='%s', current='%s'",
+                                          var.name, saved_value, var.value)
+                    if saved_value != var.value:
                         return False
-            
+                except:
+                    self.logger.warning("Scene '%s': Monitored variable ID %s no longer exists. Please reconfigure the scene.",
+                                        scene_dev.name, var_id)
+                    return False
+
             return True
             
         except Exception as e:
@@ -891,65 +1268,28 @@ class Plugin(indigo.PluginBase):
     def _apply_scene_state(self, scene_dev):
         """Apply the saved scene state to all monitored devices"""
         try:
-            saved_states_str = scene_dev.pluginProps.get('savedStates', '')
-            if not saved_states_str:
+            saved_states = self._get_scene_states(scene_dev)
+            if saved_states is None:
                 self.logger.warning(f"Scene '{scene_dev.name}' has no saved state")
                 return
-            
-            try:
-                saved_states = json.loads(saved_states_str)
-            except (json.JSONDecodeError, ValueError) as e:
-                self.logger.error(f"Scene '{scene_dev.name}': Invalid saved state data. Please save the scene state again.")
-                return
-            
-            for item_key, saved_state in saved_states.items():
-                if item_key.startswith('device_'):
-                    dev_id_str = item_key.replace('device_', '')
-                    try:
-                        dev_id = int(dev_id_str)
-                        dev = indigo.devices[dev_id]
-                        
-                        if saved_state['type'] == 'dimmer':
-                            indigo.dimmer.setBrightness(dev_id, value=saved_state['brightness'])
-                            
-                        elif saved_state['type'] == 'relay':
-                            if saved_state['onState']:
-                                indigo.device.turnOn(dev_id)
-                            else:
-                                indigo.device.turnOff(dev_id)
-                                
-                        elif saved_state['type'] == 'thermostat':
-                            # Convert integer values back to enums
-                            hvac_mode = indigo.kHvacMode(saved_state['hvacMode'])
-                            fan_mode = indigo.kFanMode(saved_state['fanMode'])
-                            
-                            indigo.thermostat.setHvacMode(dev_id, value=hvac_mode)
-                            indigo.thermostat.setFanMode(dev_id, value=fan_mode)
-                            indigo.thermostat.setCoolSetpoint(dev_id, value=saved_state['coolSetpoint'])
-                            indigo.thermostat.setHeatSetpoint(dev_id, value=saved_state['heatSetpoint'])
-                            
-                        elif saved_state['type'] == 'fan':
-                            indigo.speedcontrol.setSpeedLevel(dev_id, value=saved_state['speedLevel'])
-                            
-                        elif saved_state['type'] == 'blind':
-                            # Blinds typically use setBrightness for position
-                            indigo.dimmer.setBrightness(dev_id, value=saved_state['position'])
-                    
-                    except Exception as e:
-                        self.logger.error(f"Error applying state to device {dev_id_str}: {e}")
-                
-                elif item_key.startswith('variable_'):
-                    # Set variable values
-                    var_id_str = item_key.replace('variable_', '')
-                    try:
-                        var_id = int(var_id_str)
-                        var = indigo.variables[var_id]
-                        self.logger.info(f"Setting variable '{var.name}' to '{saved_state['value']}'")
-                        indigo.variable.updateValue(var_id, saved_state['value'])
-                    except Exception as e:
-                        self.logger.error(f"Error applying state to variable {var_id_str}: {e}")
-                        import traceback
-                        self.logger.error(traceback.format_exc())
+
+            for dev_id, saved in saved_states.get('d', ()):
+                try:
+                    applier = _SCENE_APPLIERS.get(saved[0])
+                    if applier is not None:
+                        applier(dev_id, saved)
+                except Exception as e:
+                    self.logger.error(f"Error applying state to device {dev_id}: {e}")
+
+            variables = indigo.variables
+            update_value = indigo.variable.updateValue
+            for var_id, saved_value in saved_states.get('v', ()):
+                try:
+                    var = variables[var_id]
+                    self.logger.info(f"Setting variable '{var.name}' to '{saved_value}'")
+                    update_value(var_id, saved_value)
+                except Exception:
+                    self.logger.exception("Error applying state to variable %s", var_id)
         
         except Exception as e:
             self.logger.error(f"Error applying scene state for {scene_dev.name}: {e}")
@@ -964,500 +1304,491 @@ class Plugin(indigo.PluginBase):
         except Exception as e:
             self.logger.error(f"Error executing action group {action_group_id}: {e}")
     
-    def deviceStartComm(self, dev):
-        # Handle variable-linked dimmers
-        if dev.deviceTypeId == "myDimmerType":
-            var_id = self._extract_var_id(dev.pluginProps.get("variableId", ""))
-            if not var_id:
-                return
-                
-            try:
-                var = indigo.variables[var_id]
-                scale_min, scale_max, is_float_scale = self._get_scale_params(dev)
-                
-                # Try to convert variable value to brightness
-                result = self._variable_to_brightness(var.value, scale_min, scale_max)
-                brightness, was_clamped, clamped_value = result if result[0] is not None else (None, False, None)
-                
-                if brightness is None:
-                    # Invalid value - set variable to match current device state (which is 0)
-                    self.logger.warning(f"Invalid variable value '{var.value}' for {dev.name}, resetting to minimum")
-                    new_var_value = self._brightness_to_variable(0, scale_min, scale_max, is_float_scale)
-                    indigo.variable.updateValue(var_id, new_var_value)
-                    brightness = 0
-                elif was_clamped:
-                    # Value was out of range - correct it
-                    new_var_value = self._brightness_to_variable(brightness, scale_min, scale_max, is_float_scale)
-                    self.logger.warning(f"Variable value '{var.value}' out of range for {dev.name}, correcting to {new_var_value}")
-                    indigo.variable.updateValue(var_id, new_var_value)
-                    var_value = new_var_value
-                else:
-                    var_value = var.value
-                
-                # Initialize caches
-                cache_key = f"{dev.id}_{var_id}"
-                self.last_variable_values[cache_key] = var_value if not was_clamped else new_var_value
-                self.last_device_brightness[dev.id] = brightness
-                
-                # Update device state
-                dev.updateStateOnServer("brightnessLevel", brightness)
-            except Exception as e:
-                self.logger.error(f"Error in deviceStartComm: {e}")
-                import traceback
-                self.logger.error(traceback.format_exc())
-        
-        # Handle scene devices
-        elif dev.deviceTypeId == "SceneDevice":
-            # Check if devices match the saved scene and set initial state
-            try:
-                matches = self._check_scene_match(dev)
-                dev.updateStateOnServer("onOffState", matches)
-                self.logger.info(f"Scene '{dev.name}' initialized: {'ON' if matches else 'OFF'}")
-            except Exception as e:
-                self.logger.error(f"Error initializing scene {dev.name}: {e}")
-        
-        # Handle Relay2Dimmer devices
-        elif dev.deviceTypeId == "Relay2Dimmer":
-            try:
-                relay1_id = dev.pluginProps.get("relay1Device")
-                relay2_id = dev.pluginProps.get("relay2Device")
-                
-                if not relay1_id or not relay2_id:
-                    self.logger.warning(f"Relay2Dimmer '{dev.name}' is not fully configured")
-                    return
-                
-                # Read current relay states and set dimmer level
-                relay1_on, relay2_on = self._get_relay_states(relay1_id, relay2_id)
-                level = self._relay_states_to_level(relay1_on, relay2_on)
-                
-                dev.updateStateOnServer("brightnessLevel", level)
-                dev.updateStateOnServer("onOffState", level > 0)
-                
-                self.logger.info(f"Relay2Dimmer '{dev.name}' initialized at {level}%")
-            except Exception as e:
-                self.logger.error(f"Error initializing Relay2Dimmer {dev.name}: {e}")
-        
-        # Handle Relay2Fan devices
-        elif dev.deviceTypeId == "Relay2Fan":
-            try:
-                relay1_id = dev.pluginProps.get("relay1Device")
-                relay2_id = dev.pluginProps.get("relay2Device")
-                
-                if not relay1_id or not relay2_id:
-                    self.logger.warning(f"Relay2Fan '{dev.name}' is not fully configured")
-                    return
-                
-                # Read current relay states and set fan level
-                relay1_on, relay2_on = self._get_relay_states(relay1_id, relay2_id)
-                level = self._relay_states_to_level(relay1_on, relay2_on)
-                
-                # Convert percentage to speed index (0-3)
-                speed_index = level // 33 if level > 0 else 0
-                
-                speed_names = ['off', 'low', 'medium', 'high']
-                self.logger.info(f"Relay2Fan '{dev.name}' initialized at {speed_names[speed_index]} (index: {speed_index})")
-            except Exception as e:
-                self.logger.error(f"Error initializing Relay2Fan {dev.name}: {e}")
-    
+    def deviceStopComm(self, dev):
+        # Drop cached per-device data so a restarted device re-reads its props
+        self._scale_cache.pop(dev.id, None)
+        self._var_id_cache.pop(dev.id, None)
+        self._forget_scene(dev.id)
+        self._relay2_config.pop(dev.id, None)
+        self._poll_ids = None
+
     def deviceUpdated(self, old_dev, new_dev):
         """Called whenever a device is updated - we use this to catch brightness changes and relay changes"""
+        # A renamed device must drop the config-dialog list cache - same
+        # treatment variable renames get in variableUpdated
+        if old_dev.name != new_dev.name:
+            self._device_cache_by_class = None
+
+        nid = new_dev.id
+        relay_parents = self._get_relay_parents()
+        is_ours = new_dev.pluginId == self.pluginId
+
+        # Fast path out: this callback fires for every device update on the
+        # server, and almost all of them are devices that no Relay2 pair or
+        # scene is watching
+        scene_owners = self._scene_members.get(nid)
+        if not is_ours and nid not in relay_parents and not scene_owners:
+            return
+
+        # A monitored scene member changed - its scenes need a fresh compare
+        # once the burst settles
+        if scene_owners:
+            self._dirty_scenes.update(scene_owners)
+            due = time.monotonic() + _SCENE_SETTLE_SECONDS
+            for sid in scene_owners:
+                self._scene_recheck_due[sid] = due
+
         # Handle variable-linked dimmers (only our plugin devices)
-        if new_dev.pluginId == self.pluginId and new_dev.deviceTypeId == "myDimmerType":
+        if is_ours and new_dev.deviceTypeId == "myDimmerType":
             # Skip if this device is currently being flashed
             if new_dev.id in self.flashing_devices:
                 return
             
             # Get the brightness level
             new_brightness = self._get_brightness(new_dev)
-            old_brightness = self.last_device_brightness.get(new_dev.id, -1)
-            
-            # Check if brightness changed
-            if new_brightness != old_brightness:
-                self.last_device_brightness[new_dev.id] = new_brightness
-                
+
+            # Check if brightness changed - claim the new value under the
+            # lock so a concurrent poll tick can't race the same transition
+            with self._cache_lock:
+                old_brightness = self.last_device_brightness.get(new_dev.id, -1)
+                changed = new_brightness != old_brightness
+                if changed:
+                    self.last_device_brightness[new_dev.id] = new_brightness
+
+            if changed:
                 # Update the linked variable
-                var_id = self._extract_var_id(new_dev.pluginProps.get("variableId", ""))
+                var_id = self._get_var_id(new_dev)
                 if not var_id:
                     return
-                
+
                 try:
-                    scale_min, scale_max, is_float_scale = self._get_scale_params(new_dev)
-                    var_value = self._brightness_to_variable(new_brightness, scale_min, scale_max, is_float_scale)
-                    
+                    scale = self._get_device_scale(new_dev)
+                    var_value = self._brightness_to_variable(new_brightness, scale)
+
+                    # Same in-flight protocol as handleDimmerAction: bump the
+                    # generation before the variable write
+                    with self._cache_lock:
+                        self._inflight[nid] = self._inflight.get(nid, 0) + 1
+
                     indigo.variable.updateValue(var_id, var_value)
-                    
+
                     # Update cache to prevent re-trigger
-                    cache_key = f"{new_dev.id}_{var_id}"
-                    self.last_variable_values[cache_key] = var_value
+                    cache_key = (new_dev.id, var_id)
+                    with self._cache_lock:
+                        self.last_variable_values[cache_key] = var_value
                 except Exception as e:
                     self.logger.error(f"Error updating variable: {e}")
         
-        # Monitor ALL relay devices for Relay2Dimmer/Fan devices
-        # Check by class name since relays can be from any plugin or native Indigo
-        if hasattr(new_dev, '__class__'):
-            class_name = new_dev.__class__.__name__
-            
-            if class_name == 'RelayDevice':
-                # Only process if the state actually changed
-                if hasattr(old_dev, 'onState') and hasattr(new_dev, 'onState'):
-                    if old_dev.onState == new_dev.onState:
-                        return  # No change, skip processing
-                
-                self.logger.debug(f"Relay '{new_dev.name}' state changed to {'ON' if new_dev.onState else 'OFF'}")
-                
-                # Check if this relay is part of any Relay2 devices
-                for dev in indigo.devices.iter(filter="self"):
-                    if dev.deviceTypeId in ["Relay2Dimmer", "Relay2Fan"]:
-                        relay1_id = dev.pluginProps.get("relay1Device")
-                        relay2_id = dev.pluginProps.get("relay2Device")
-                        
-                        if str(new_dev.id) in [relay1_id, relay2_id]:
-                            # This relay is part of a Relay2 device - update it
-                            try:
-                                relay1_on, relay2_on = self._get_relay_states(relay1_id, relay2_id)
-                                level = self._relay_states_to_level(relay1_on, relay2_on)
-                                
-                                if dev.deviceTypeId == "Relay2Dimmer":
-                                    self.logger.info(f"Relay change detected, updating Relay2Dimmer '{dev.name}' to {level}%")
-                                    dev.updateStateOnServer("brightnessLevel", level)
-                                    dev.updateStateOnServer("onOffState", level > 0)
-                                else:  # Relay2Fan
-                                    speed_index = level // 33 if level > 0 else 0
-                                    speed_names = ['off', 'low', 'medium', 'high']
-                                    self.logger.info(f"Relay change detected, updating Relay2Fan '{dev.name}' to {speed_names[speed_index]}")
-                                    dev.updateStateOnServer("speedIndex", speed_index)
-                                    dev.updateStateOnServer("speedLevel", level)
-                                    dev.updateStateOnServer("onOffState", level > 0)
-                            except Exception as e:
-                                self.logger.error(f"Error updating Relay2 device {dev.name}: {e}")
+        # Monitor the relay devices that belong to a Relay2Dimmer/Fan - the
+        # owner index already filters out every other relay on the server
+        if nid in relay_parents:
+            # Only process if the state actually changed
+            if hasattr(old_dev, 'onState') and hasattr(new_dev, 'onState'):
+                if old_dev.onState == new_dev.onState:
+                    return  # No change, skip processing
+
+            self.logger.debug("Relay '%s' state changed to %s", new_dev.name, 'ON' if new_dev.onState else 'OFF')
+
+            # Update every Relay2 device this relay is part of
+            for parent_id in relay_parents[nid]:
+                try:
+                    dev = indigo.devices[parent_id]
+                    relay1_id, relay2_id = self._get_relay2_config(dev)
+
+                    relay1_on, relay2_on = self._get_relay_states(relay1_id, relay2_id)
+                    level, speed_index, speed_name = _RELAY2_TABLE[bool(relay1_on), bool(relay2_on)]
+
+                    # Keep the safety sweep's change cache current so it
+                    # doesn't re-push a state this handler already mirrored
+                    self.relay2_last_states[dev.id] = (relay1_on, relay2_on)
+
+                    # Only write states that actually differ - a no-op write
+                    # still costs a round-trip and broadcasts a fresh
+                    # deviceUpdated that re-enters this handler
+                    states = dev.states
+                    if dev.deviceTypeId == "Relay2Dimmer":
+                        updates = [{'key': key, 'value': value}
+                                   for key, value in (('brightnessLevel', level),
+                                                      ('onOffState', level > 0))
+                                   if states.get(key) != value]
+                        if updates:
+                            self.logger.info("Relay change detected, updating Relay2Dimmer '%s' to %d%%", dev.name, level)
+                            dev.updateStatesOnServer(updates)
+                    else:  # Relay2Fan
+                        updates = [{'key': key, 'value': value}
+                                   for key, value in (('speedIndex', speed_index),
+                                                      ('speedLevel', level),
+                                                      ('onOffState', level > 0))
+                                   if states.get(key) != value]
+                        if updates:
+                            self.logger.info("Relay change detected, updating Relay2Fan '%s' to %s", dev.name, speed_name)
+                            dev.updateStatesOnServer(updates)
+                except Exception as e:
+                    self.logger.error("Error updating Relay2 device %s: %s", parent_id, e)
     
     def actionControlDimmerRelay(self, action, dev):
         """Main entry point for dimmer/relay device control actions"""
-        self.logger.info(f"actionControlDimmerRelay called for {dev.name} (type: {dev.deviceTypeId}), action: {action.deviceAction}")
+        self.logger.info("actionControlDimmerRelay called for %s (type: %s), action: %s", dev.name, dev.deviceTypeId, action.deviceAction)
         
         # Handle Relay2Dimmer devices
         if dev.deviceTypeId == "Relay2Dimmer":
-            self.logger.info(f"Handling Relay2Dimmer device: {dev.name}")
-            relay1_id = dev.pluginProps.get("relay1Device")
-            relay2_id = dev.pluginProps.get("relay2Device")
+            self.logger.info("Handling Relay2Dimmer device: %s", dev.name)
+            relay1_id, relay2_id = self._get_relay2_config(dev)
             
-            self.logger.info(f"Relay1: {relay1_id}, Relay2: {relay2_id}")
+            self.logger.info("Relay1: %s, Relay2: %s", relay1_id, relay2_id)
             
             if not relay1_id or not relay2_id:
-                self.logger.error(f"Relay2Dimmer '{dev.name}' is not fully configured")
+                self.logger.error("Relay2Dimmer '%s' is not fully configured", dev.name)
                 return
             
-            target_level = None
-            
-            if action.deviceAction == indigo.kDimmerRelayAction.TurnOn:
-                target_level = 100
-            elif action.deviceAction == indigo.kDimmerRelayAction.TurnOff:
-                target_level = 0
-            elif action.deviceAction == indigo.kDimmerRelayAction.SetBrightness:
-                value = action.actionValue
-                if isinstance(value, list):
-                    value = value[0] if value else 0
-                target_level = value
-            elif action.deviceAction == indigo.kDimmerRelayAction.BrightenBy:
-                current = dev.brightness
-                value = action.actionValue
-                if isinstance(value, list):
-                    value = value[0] if value else 0
-                target_level = min(100, current + value)
-            elif action.deviceAction == indigo.kDimmerRelayAction.DimBy:
-                current = dev.brightness
-                value = action.actionValue
-                if isinstance(value, list):
-                    value = value[0] if value else 0
-                target_level = max(0, current - value)
-            
+            # Constant-target actions resolve through the hashed lookup;
+            # only the value-carrying ones need real branching
+            target_level = self._dimmer_target_levels.get(action.deviceAction)
+
+            if target_level is None:
+                if action.deviceAction == indigo.kDimmerRelayAction.SetBrightness:
+                    target_level = _unwrap_action_value(action.actionValue)
+                elif action.deviceAction == indigo.kDimmerRelayAction.BrightenBy:
+                    value = _unwrap_action_value(action.actionValue)
+                    target_level = min(100, dev.brightness + value)
+                elif action.deviceAction == indigo.kDimmerRelayAction.DimBy:
+                    value = _unwrap_action_value(action.actionValue)
+                    target_level = max(0, dev.brightness - value)
+
             if target_level is not None:
                 # Round to valid level and update device state immediately
                 relay1_on, relay2_on = self._level_to_relay_states(target_level)
                 rounded_level = self._relay_states_to_level(relay1_on, relay2_on)
                 
-                self.logger.info(f"Relay2Dimmer '{dev.name}': setting to {rounded_level}%")
-                
-                # Update device state immediately so UI shows the change
-                dev.updateStateOnServer("brightnessLevel", rounded_level)
-                dev.updateStateOnServer("onOffState", rounded_level > 0)
+                self.logger.info("Relay2Dimmer '%s': setting to %d%%", dev.name, rounded_level)
                 
-                # Schedule relay changes in a thread with 1 second delay
-                def apply_with_delay():
-                    time.sleep(1)
-                    self._apply_relay_states(relay1_id, relay2_id, relay1_on, relay2_on)
+                # Update device state immediately so UI shows the change -
+                # one batched call instead of two server round-trips
+                dev.updateStatesOnServer([
+                    {'key': 'brightnessLevel', 'value': rounded_level},
+                    {'key': 'onOffState', 'value': rounded_level > 0},
+                ])
                 
-                thread = threading.Thread(target=apply_with_delay)
-                thread.daemon = True
-                thread.start()
-            
+                # Schedule the relay write on the shared worker with the usual
+                # 1 second settle delay
+                self._schedule_relay_apply(dev.id, relay1_id, relay2_id, relay1_on, relay2_on)
+
             return
-        
+
         # Handle variable-linked dimmers
         if action.deviceAction == indigo.kDimmerRelayAction.TurnOn:
             self.handleDimmerAction(action, dev, 100)
         elif action.deviceAction == indigo.kDimmerRelayAction.TurnOff:
             self.handleDimmerAction(action, dev, 0)
         elif action.deviceAction == indigo.kDimmerRelayAction.SetBrightness:
-            value = action.actionValue
-            if isinstance(value, list):
-                value = value[0] if value else 0
+            value = _unwrap_action_value(action.actionValue)
             self.handleDimmerAction(action, dev, value)
         elif action.deviceAction == indigo.kDimmerRelayAction.BrightenBy:
             current = self._get_brightness(dev)
-            value = action.actionValue
-            if isinstance(value, list):
-                value = value[0] if value else 0
+            value = _unwrap_action_value(action.actionValue)
             new_level = min(100, current + value)
             self.handleDimmerAction(action, dev, new_level)
         elif action.deviceAction == indigo.kDimmerRelayAction.DimBy:
             current = self._get_brightness(dev)
-            value = action.actionValue
-            if isinstance(value, list):
-                value = value[0] if value else 0
+            value = _unwrap_action_value(action.actionValue)
             new_level = max(0, current - value)
             self.handleDimmerAction(action, dev, new_level)
     
     def handleDimmerAction(self, action, dev, level):
         """Handle the actual dimmer action"""
-        var_id = self._extract_var_id(dev.pluginProps.get("variableId", ""))
+        var_id = self._get_var_id(dev)
         if not var_id:
             return
             
         try:
             level = max(0, min(100, int(level)))
-            scale_min, scale_max, is_float_scale = self._get_scale_params(dev)
-            var_value = self._brightness_to_variable(level, scale_min, scale_max, is_float_scale)
+            scale = self._get_device_scale(dev)
+            var_value = self._brightness_to_variable(level, scale)
             
+            # Bump the generation first so a poll tick that read the old
+            # variable value can tell it raced this write and stand down
+            with self._cache_lock:
+                self._inflight[dev.id] = self._inflight.get(dev.id, 0) + 1
+
             indigo.variable.updateValue(var_id, var_value)
-            dev.updateStateOnServer("brightnessLevel", level)
-            self.last_device_brightness[dev.id] = level
-            
-            # Update cached value to prevent immediate re-trigger
-            cache_key = f"{dev.id}_{var_id}"
-            self.last_variable_values[cache_key] = var_value
+
+            # Update cached values to prevent immediate re-trigger, and skip
+            # the state round-trip when the level is already current
+            with self._cache_lock:
+                already_current = self.last_device_brightness.get(dev.id) == level
+                self.last_device_brightness[dev.id] = level
+                self.last_variable_values[(dev.id, var_id)] = var_value
+            if not already_current:
+                dev.updateStateOnServer("brightnessLevel", level)
         except Exception as e:
-            self.logger.error(f"Error in handleDimmerAction: {e}")
+            self.logger.error("Error in handleDimmerAction: %s", e)
     
     def actionControlSpeedControl(self, action, dev):
         """Handle speed control actions for Relay2Fan devices"""
         if dev.deviceTypeId == "Relay2Fan":
-            relay1_id = dev.pluginProps.get("relay1Device")
-            relay2_id = dev.pluginProps.get("relay2Device")
+            relay1_id, relay2_id = self._get_relay2_config(dev)
             
             if not relay1_id or not relay2_id:
-                self.logger.error(f"Relay2Fan '{dev.name}' is not fully configured")
+                self.logger.error("Relay2Fan '%s' is not fully configured", dev.name)
                 return
             
             target_speed_index = None
-            
+            # dev.states is a proxy that rebuilds its dict per access - bind
+            # it once for the branches that read the current speed
+            states = dev.states
+
             if action.speedControlAction == indigo.kSpeedControlAction.TurnOn:
                 target_speed_index = 3  # High
             elif action.speedControlAction == indigo.kSpeedControlAction.TurnOff:
                 target_speed_index = 0  # Off
             elif action.speedControlAction == indigo.kSpeedControlAction.SetSpeedIndex:
-                value = action.actionValue
-                if isinstance(value, list):
-                    value = value[0] if value else 0
+                value = _unwrap_action_value(action.actionValue)
                 target_speed_index = max(0, min(3, int(value)))
             elif action.speedControlAction == indigo.kSpeedControlAction.IncreaseSpeedIndex:
-                current = dev.states.get('speedIndex', 0)
+                current = states.get('speedIndex', 0)
                 target_speed_index = min(3, current + 1)
             elif action.speedControlAction == indigo.kSpeedControlAction.DecreaseSpeedIndex:
-                current = dev.states.get('speedIndex', 0)
+                current = states.get('speedIndex', 0)
                 target_speed_index = max(0, current - 1)
             
             if target_speed_index is not None:
-                # Convert speed index to level (0, 33, 66, 100)
-                level = target_speed_index * 33 if target_speed_index > 0 else 0
-                
-                speed_names = ['off', 'low', 'medium', 'high']
-                self.logger.info(f"Relay2Fan '{dev.name}': setting to {speed_names[target_speed_index]}")
-                
-                # Schedule relay changes in a thread with 1 second delay
-                relay1_on, relay2_on = self._level_to_relay_states(level)
-                
-                def apply_with_delay():
-                    time.sleep(1)
-                    self._apply_relay_states(relay1_id, relay2_id, relay1_on, relay2_on)
-                
-                thread = threading.Thread(target=apply_with_delay)
-                thread.daemon = True
-                thread.start()
-    
-    def actionControlDevice(self, action, dev):
-        """Handle general device actions"""
-        # Handle Relay2Fan as a custom device
-        if dev.deviceTypeId == "Relay2Fan":
-            relay1_id = dev.pluginProps.get("relay1Device")
-            relay2_id = dev.pluginProps.get("relay2Device")
-            
-            if not relay1_id or not relay2_id:
-                self.logger.error(f"Relay2Fan '{dev.name}' is not fully configured")
-                return
-            
-            target_speed_index = None
-            
-            if action.deviceAction == indigo.kDeviceAction.TurnOn:
-                target_speed_index = 3  # High
-            elif action.deviceAction == indigo.kDeviceAction.TurnOff:
-                target_speed_index = 0  # Off
-            elif action.deviceAction == indigo.kDeviceAction.Toggle:
-                current = dev.states.get('speedIndex', 0)
-                target_speed_index = 0 if current > 0 else 3
-            
-            if target_speed_index is not None:
-                level = target_speed_index * 33 if target_speed_index > 0 else 0
-                
-                speed_names = ['off', 'low', 'medium', 'high']
-                self.logger.info(f"Relay2Fan '{dev.name}': setting to {speed_names[target_speed_index]}")
-                
-                dev.updateStateOnServer("speedIndex", target_speed_index)
-                dev.updateStateOnServer("speedIndex.ui", speed_names[target_speed_index])
-                dev.updateStateOnServer("speedLevel", level)
-                dev.updateStateOnServer("onOffState", target_speed_index > 0)
-                
-                relay1_on, relay2_on = self._level_to_relay_states(level)
-                
-                def apply_with_delay():
-                    time.sleep(1)
-                    self._apply_relay_states(relay1_id, relay2_id, relay1_on, relay2_on)
-                
-                thread = threading.Thread(target=apply_with_delay)
-                thread.daemon = True
-                thread.start()
-            
-            return
-    
+                self.logger.info("Relay2Fan '%s': setting to %s", dev.name, _SPEED_NAMES[target_speed_index])
+
+                # The speed index maps straight to the relay pair - no level
+                # conversion round-trip needed
+                relay1_on, relay2_on = _SPEED_TO_RELAYS[target_speed_index]
+
+                self._schedule_relay_apply(dev.id, relay1_id, relay2_id, relay1_on, relay2_on)
+
     def runConcurrentThread(self):
         """Poll for variable changes and update devices accordingly, also monitor scenes"""
         try:
             while True:
-                # Handle variable-linked dimmers
-                for dev in indigo.devices.iter(filter="self"):
-                    if dev.deviceTypeId == "myDimmerType":
-                        var_id = self._extract_var_id(dev.pluginProps.get("variableId", ""))
+                # One pass over the cached plugin-device roster instead of
+                # materializing indigo.devices.iter(filter="self") twice a second
+                activity = False
+                var_values = {}  # var id -> raw value, fetched once per tick
+                scene_snapshot = {}  # member dev id -> extracted state, shared across scenes
+
+                # Relay mirroring is handled by deviceUpdated as changes
+                # arrive; the poll only re-reads the relays occasionally in
+                # case a callback was missed
+                sweep_relay2 = time.time() >= self._relay2_sweep_due
+                if sweep_relay2:
+                    self._relay2_sweep_due = time.time() + _RELAY2_SWEEP_SECONDS
+
+                for dev_id, type_id in self._get_poll_ids():
+                    try:
+                        dev = indigo.devices[dev_id]
+                    except Exception:
+                        continue  # deleted between roster rebuilds
+
+                    # Handle variable-linked dimmers
+                    if type_id == "myDimmerType":
+                        var_id = self._get_var_id(dev)
                         if not var_id:
                             continue
-                        
+
                         try:
-                            var = indigo.variables[var_id]
-                            current_value = var.value
-                            
-                            # Handle if value is a list
-                            while isinstance(current_value, list):
-                                current_value = current_value[0] if current_value else "0"
-                            
-                            current_value = str(current_value)
-                            
-                            # Check if value changed
-                            cache_key = f"{dev.id}_{var_id}"
-                            last_value = self.last_variable_values.get(cache_key)
-                            
-                            if last_value != current_value:
-                                scale_min, scale_max, is_float_scale = self._get_scale_params(dev)
-                                result = self._variable_to_brightness(current_value, scale_min, scale_max)
+                            # Snapshot the write generation before reading
+                            # the variable - see the in-flight check below
+                            gen = self._inflight.get(dev_id, 0)
+
+                            # Fetch each distinct variable once per tick even
+                            # when several dimmers are linked to it, and
+                            # normalize the odd list-wrapped value here on
+                            # ingest rather than per device per tick
+                            if var_id in var_values:
+                                raw_value = var_values[var_id]
+                            else:
+                                raw_value = indigo.variables[var_id].value
+                                while isinstance(raw_value, list):
+                                    raw_value = raw_value[0] if raw_value else "0"
+                                var_values[var_id] = raw_value
+
+                            # Compare on the raw value so the steady state
+                            # skips the list-unwrap and str() coercion; claim
+                            # the new value under the lock so an action
+                            # callback can't race the same transition
+                            cache_key = (dev.id, var_id)
+                            with self._cache_lock:
+                                if self._inflight.get(dev_id, 0) != gen:
+                                    # An action wrote the variable after we
+                                    # read it - our value may be stale, so
+                                    # leave reconciliation to the next tick
+                                    continue
+                                changed = self.last_variable_values.get(cache_key) != raw_value
+                                if changed:
+                                    self.last_variable_values[cache_key] = raw_value
+
+                            if changed:
+                                activity = True
+                                current_value = str(raw_value)
+                                scale = self._get_device_scale(dev)
+                                result = self._variable_to_brightness(current_value, scale)
                                 brightness, was_clamped, clamped_value = result if result[0] is not None else (None, False, None)
                                 
                                 if brightness is None:
                                     # Invalid value - reset variable to current device brightness
                                     current_brightness = self._get_brightness(dev)
-                                    corrected_value = self._brightness_to_variable(current_brightness, scale_min, scale_max, is_float_scale)
-                                    self.logger.warning(f"Invalid variable value '{current_value}' for {dev.name}, resetting to {corrected_value}")
+                                    corrected_value = self._brightness_to_variable(current_brightness, scale)
+                                    self.logger.warning("Invalid variable value '%s' for %s, resetting to %s", current_value, dev.name, corrected_value)
                                     indigo.variable.updateValue(var_id, corrected_value)
-                                    self.last_variable_values[cache_key] = corrected_value
+                                    with self._cache_lock:
+                                        self.last_variable_values[cache_key] = corrected_value
                                 elif was_clamped:
                                     # Value was out of range - correct it
-                                    corrected_value = self._brightness_to_variable(brightness, scale_min, scale_max, is_float_scale)
-                                    self.logger.warning(f"Variable value '{current_value}' out of range for {dev.name}, correcting to {corrected_value}")
+                                    corrected_value = self._brightness_to_variable(brightness, scale)
+                                    self.logger.warning("Variable value '%s' out of range for %s, correcting to %s", current_value, dev.name, corrected_value)
                                     indigo.variable.updateValue(var_id, corrected_value)
-                                    self.last_variable_values[cache_key] = corrected_value
-                                    dev.updateStateOnServer("brightnessLevel", brightness)
-                                    self.last_device_brightness[dev.id] = brightness
+                                    with self._cache_lock:
+                                        already_current = self.last_device_brightness.get(dev.id) == brightness
+                                        self.last_variable_values[cache_key] = corrected_value
+                                        self.last_device_brightness[dev.id] = brightness
+                                    if not already_current:
+                                        dev.updateStateOnServer("brightnessLevel", brightness)
                                 else:
-                                    # Valid value, update device
-                                    self.last_variable_values[cache_key] = current_value
-                                    dev.updateStateOnServer("brightnessLevel", brightness)
-                                    self.last_device_brightness[dev.id] = brightness
+                                    # Valid value, update device - the raw
+                                    # value was already claimed above. Skip
+                                    # the round-trip if the brightness maps
+                                    # to the level the device already shows
+                                    with self._cache_lock:
+                                        already_current = self.last_device_brightness.get(dev.id) == brightness
+                                        self.last_device_brightness[dev.id] = brightness
+                                    if not already_current:
+                                        dev.updateStateOnServer("brightnessLevel", brightness)
                         except Exception as e:
-                            self.logger.error(f"Error checking variable: {e}")
+                            self.logger.error("Error checking variable: %s", e)
                     
                     # Handle scene devices
-                    elif dev.deviceTypeId == "SceneDevice":
+                    elif type_id == "SceneDevice":
                         try:
-                            # Check if there's a pending timer for this scene
-                            timer_info = self.scene_off_timers.get(dev.id)
-                            if timer_info:
-                                # Check if 10 seconds have elapsed
-                                if time.time() >= timer_info['check_time']:
-                                    # Remove the timer
-                                    with self.scene_lock:
-                                        if dev.id in self.scene_off_timers:
-                                            del self.scene_off_timers[dev.id]
-                                    
-                                    # Check if devices match the scene
-                                    if self._check_scene_match(dev):
-                                        dev.updateStateOnServer("onOffState", True)
-                                # If timer still active, skip normal monitoring
+                            # A pending OFF timer is serviced from the heap
+                            # below - skip normal monitoring until it fires
+                            if dev.id in self.scene_off_timers:
                                 continue
-                            
+
                             # Normal monitoring - check if current states match scene
-                            matches = self._check_scene_match(dev)
-                            
+                            matches = self._check_scene_match(dev, scene_snapshot)
+
                             # Update device state if it changed
                             if matches != dev.onState:
+                                activity = True
                                 dev.updateStateOnServer("onOffState", matches)
                         
                         except Exception as e:
-                            self.logger.error(f"Error monitoring scene {dev.name}: {e}")
-                
-                # Handle Relay2Dimmer and Relay2Fan monitoring
-                for dev in indigo.devices.iter(filter="self"):
-                    if dev.deviceTypeId in ["Relay2Dimmer", "Relay2Fan"]:
+                            self.logger.error("Error monitoring scene %s: %s", dev.name, e)
+
+                    # Handle Relay2Dimmer and Relay2Fan safety sweep
+                    elif type_id in _RELAY2_TYPE_IDS:
+                        if not sweep_relay2:
+                            continue
                         try:
-                            relay1_id = dev.pluginProps.get("relay1Device")
-                            relay2_id = dev.pluginProps.get("relay2Device")
-                            
+                            relay1_id, relay2_id = self._get_relay2_config(dev)
+
                             if not relay1_id or not relay2_id:
                                 continue
                             
                             # Get current relay states
                             relay1_on, relay2_on = self._get_relay_states(relay1_id, relay2_id)
                             
-                            # Check if states changed from last check
-                            cache_key = f"{dev.id}_relay_states"
-                            last_states = self.relay2_last_states.get(cache_key)
+                            # Check if states changed from last check - the
+                            # dedicated dict needs no suffixed string key
+                            last_states = self.relay2_last_states.get(dev_id)
                             current_states = (relay1_on, relay2_on)
                             
                             if last_states != current_states:
-                                # States changed - update device
-                                self.relay2_last_states[cache_key] = current_states
-                                level = self._relay_states_to_level(relay1_on, relay2_on)
-                                
-                                if dev.deviceTypeId == "Relay2Dimmer":
-                                    self.logger.info(f"Relay change detected, updating Relay2Dimmer '{dev.name}' to {level}%")
-                                    dev.updateStateOnServer("brightnessLevel", level)
-                                    dev.updateStateOnServer("onOffState", level > 0)
+                                # States changed - update device. The table
+                                # decodes the pair straight to level, speed
+                                # index and name without any arithmetic
+                                activity = True
+                                self.relay2_last_states[dev_id] = current_states
+                                level, speed_index, speed_name = _RELAY2_TABLE[
+                                    bool(relay1_on), bool(relay2_on)]
+
+                                # Same no-op filter as the deviceUpdated
+                                # mirror - only push states that differ
+                                states = dev.states
+                                if type_id == "Relay2Dimmer":
+                                    updates = [{'key': key, 'value': value}
+                                               for key, value in (('brightnessLevel', level),
+                                                                  ('onOffState', level > 0))
+                                               if states.get(key) != value]
+                                    if updates:
+                                        self.logger.info("Relay change detected, updating Relay2Dimmer '%s' to %d%%", dev.name, level)
+                                        dev.updateStatesOnServer(updates)
                                 else:  # Relay2Fan
-                                    speed_index = level // 33 if level > 0 else 0
-                                    speed_names = ['off', 'low', 'medium', 'high']
-                                    self.logger.info(f"Relay change detected, updating Relay2Fan '{dev.name}' to {speed_names[speed_index]}")
-                                    dev.updateStateOnServer("speedIndex", speed_index)
-                                    dev.updateStateOnServer("speedLevel", level)
-                                    dev.updateStateOnServer("onOffState", level > 0)
+                                    updates = [{'key': key, 'value': value}
+                                               for key, value in (('speedIndex', speed_index),
+                                                                  ('speedIndex.ui', speed_name),
+                                                                  ('speedLevel', level),
+                                                                  ('onOffState', level > 0))
+                                               if states.get(key) != value]
+                                    if updates:
+                                        self.logger.info("Relay change detected, updating Relay2Fan '%s' to %s", dev.name, speed_name)
+                                        dev.updateStatesOnServer(updates)
                         
                         except Exception as e:
-                            self.logger.error(f"Error monitoring Relay2 device {dev.name}: {e}")
-                
-                self.sleep(1)
+                            self.logger.error("Error monitoring Relay2 device %s: %s", dev.name, e)
+
+                # Service expired scene OFF timers from the heap and let the
+                # next deadline shorten the sleep instead of re-walking every
+                # scene at 1 Hz until its 10 seconds are up
+                sleep_s = 1.0
+                heap = self._scene_timer_heap
+                if heap:
+                    now = time.time()
+                    expired = []
+                    # heappush/heappop are multi-step sifts on the shared
+                    # list, so pop (and peek the next deadline) under the
+                    # same lock the TurnOff branch pushes under; the match
+                    # checks run outside it
+                    with self.scene_lock:
+                        while heap and heap[0][0] <= now:
+                            check_time, scene_id = heapq.heappop(heap)
+                            timer_info = self.scene_off_timers.get(scene_id)
+                            if timer_info is None or timer_info['check_time'] != check_time:
+                                continue  # cancelled or re-armed - stale heap entry
+                            del self.scene_off_timers[scene_id]
+                            expired.append(scene_id)
+                        if heap:
+                            sleep_s = max(0.05, min(1.0, heap[0][0] - now))
+                    for scene_id in expired:
+                        try:
+                            scene_dev = indigo.devices[scene_id]
+                            if self._check_scene_match(scene_dev, scene_snapshot):
+                                scene_dev.updateStateOnServer("onOffState", True)
+                        except Exception as e:
+                            self.logger.error("Error checking scene timer for device %s: %s", scene_id, e)
+
+                # Idle backoff: after half a minute with no changes and no
+                # pending timers, drop to a 5 second sweep. Any observed
+                # change (or a variableUpdated callback) restores 1 Hz
+                if activity:
+                    self._poll_quiet_cycles = 0
+                else:
+                    self._poll_quiet_cycles += 1
+                if sleep_s >= 1.0 and not self.scene_off_timers and self._poll_quiet_cycles >= 30:
+                    sleep_s = 5.0
+
+                self.sleep(sleep_s)
         except self.StopThread:
             pass
     
     ########################################
     def startup(self):
+        # The relay mirror relies on deviceUpdated firing for the native
+        # relays that back Relay2 devices; Indigo only delivers callbacks
+        # for devices outside this plugin after subscribing
+        indigo.devices.subscribeToChanges()
+        # Scene dirty-marking (and the poll loop's idle-backoff escape)
+        # depends on variableUpdated, which likewise never fires without
+        # a subscription
+        indigo.variables.subscribeToChanges()
         self.logger.info("Plugin started")
     
     def shutdown(self):
+        self._flash_executor.shutdown(wait=False)
         self.logger.info("Plugin stopped")
         
     ########################################
@@ -1468,8 +1799,105 @@ class Plugin(indigo.PluginBase):
     def deviceStartComm(self, dev):
         # self.logger.debug(f"deviceStartComm: {dev.name}")
 
-        props = dev.pluginProps
-        if dev.deviceTypeId == 'myColorType':
+        # A re-enabled device needs to rejoin the poll roster
+        self._poll_ids = None
+
+        type_id = dev.deviceTypeId
+
+        # Handle variable-linked dimmers
+        if type_id == "myDimmerType":
+            var_id = self._get_var_id(dev)
+            if not var_id:
+                return
+
+            try:
+                var = indigo.variables[var_id]
+                # Classify the scale once at startup - drop any stale cache
+                # entry first since the props may have just been edited
+                self._scale_cache.pop(dev.id, None)
+                scale = self._get_device_scale(dev)
+
+                # Try to convert variable value to brightness
+                result = self._variable_to_brightness(var.value, scale)
+                brightness, was_clamped, clamped_value = result if result[0] is not None else (None, False, None)
+
+                if brightness is None:
+                    # Invalid value - set variable to match current device state (which is 0)
+                    self.logger.warning(f"Invalid variable value '{var.value}' for {dev.name}, resetting to minimum")
+                    new_var_value = self._brightness_to_variable(0, scale)
+                    indigo.variable.updateValue(var_id, new_var_value)
+                    brightness = 0
+                elif was_clamped:
+                    # Value was out of range - correct it
+                    new_var_value = self._brightness_to_variable(brightness, scale)
+                    self.logger.warning(f"Variable value '{var.value}' out of range for {dev.name}, correcting to {new_var_value}")
+                    indigo.variable.updateValue(var_id, new_var_value)
+                    var_value = new_var_value
+                else:
+                    var_value = var.value
+
+                # Initialize caches
+                cache_key = (dev.id, var_id)
+                with self._cache_lock:
+                    self.last_variable_values[cache_key] = var_value if not was_clamped else new_var_value
+                    self.last_device_brightness[dev.id] = brightness
+
+                # Update device state
+                dev.updateStateOnServer("brightnessLevel", brightness)
+            except Exception:
+                self.logger.exception("Error in deviceStartComm")
+
+        # Handle scene devices
+        elif type_id == "SceneDevice":
+            # Check if devices match the saved scene and set initial state
+            try:
+                matches = self._check_scene_match(dev)
+                dev.updateStateOnServer("onOffState", matches)
+                self.logger.info(f"Scene '{dev.name}' initialized: {'ON' if matches else 'OFF'}")
+            except Exception as e:
+                self.logger.error(f"Error initializing scene {dev.name}: {e}")
+
+        # Handle Relay2Dimmer devices
+        elif type_id == "Relay2Dimmer":
+            try:
+                relay1_id, relay2_id = self._get_relay2_config(dev)
+
+                if not relay1_id or not relay2_id:
+                    self.logger.warning(f"Relay2Dimmer '{dev.name}' is not fully configured")
+                    return
+
+                # Read current relay states and set dimmer level
+                relay1_on, relay2_on = self._get_relay_states(relay1_id, relay2_id)
+                level = self._relay_states_to_level(relay1_on, relay2_on)
+
+                dev.updateStatesOnServer([
+                    {'key': 'brightnessLevel', 'value': level},
+                    {'key': 'onOffState', 'value': level > 0},
+                ])
+
+                self.logger.info(f"Relay2Dimmer '{dev.name}' initialized at {level}%")
+            except Exception as e:
+                self.logger.error(f"Error initializing Relay2Dimmer {dev.name}: {e}")
+
+        # Handle Relay2Fan devices
+        elif type_id == "Relay2Fan":
+            try:
+                relay1_id, relay2_id = self._get_relay2_config(dev)
+
+                if not relay1_id or not relay2_id:
+                    self.logger.warning(f"Relay2Fan '{dev.name}' is not fully configured")
+                    return
+
+                # Read current relay states and decode speed in one lookup
+                relay1_on, relay2_on = self._get_relay_states(relay1_id, relay2_id)
+                _, speed_index, speed_name = _RELAY2_TABLE[bool(relay1_on), bool(relay2_on)]
+
+                self.logger.info(f"Relay2Fan '{dev.name}' initialized at {speed_name} (index: {speed_index})")
+            except Exception as e:
+                self.logger.error(f"Error initializing Relay2Fan {dev.name}: {e}")
+
+        elif type_id == 'myColorType':
+            props = dev.pluginProps
             # Set SupportsColor property so Indigo knows device accepts color actions and should use color UI.
             props["SupportsColor"] = True
 
@@ -1478,7 +1906,8 @@ class Plugin(indigo.PluginBase):
                 del props["IsLockSubType"]
 
             dev.replacePluginPropsOnServer(props)
-        elif dev.deviceTypeId == 'myLockType':
+        elif type_id == 'myLockType':
+            props = dev.pluginProps
             # Set IsLockSubType property so Indigo knows device accepts lock actions and should use lock UI.
             props["IsLockSubType"] = True
 
@@ -1490,6 +1919,17 @@ class Plugin(indigo.PluginBase):
 
     ########################################
     def validateDeviceConfigUi(self, values_dict, type_id, dev_id):
+        # Scale or variable settings may have changed - drop the cached values
+        self._scale_cache.pop(dev_id, None)
+        self._var_id_cache.pop(dev_id, None)
+        # Relay assignments may have changed too - rebuild the owner index
+        # and the per-device relay pair
+        self._relay_to_parents = None
+        self._relay2_config.pop(dev_id, None)
+        # A scene dialog may have rewritten savedStates - re-parse on next check
+        self._forget_scene(dev_id)
+        # A previously unconfigured device may now qualify for polling
+        self._poll_ids = None
         return (True, values_dict)
 
     ########################################
@@ -1498,12 +1938,11 @@ class Plugin(indigo.PluginBase):
     def actionControlDevice(self, action, dev):
         # Handle Relay2Dimmer devices
         if dev.deviceTypeId == "Relay2Dimmer":
-            self.logger.info(f"Handling Relay2Dimmer device control: {dev.name}")
-            relay1_id = dev.pluginProps.get("relay1Device")
-            relay2_id = dev.pluginProps.get("relay2Device")
+            self.logger.info("Handling Relay2Dimmer device control: %s", dev.name)
+            relay1_id, relay2_id = self._get_relay2_config(dev)
             
             if not relay1_id or not relay2_id:
-                self.logger.error(f"Relay2Dimmer '{dev.name}' is not fully configured")
+                self.logger.error("Relay2Dimmer '%s' is not fully configured", dev.name)
                 return
             
             target_level = None
@@ -1523,31 +1962,26 @@ class Plugin(indigo.PluginBase):
                 relay1_on, relay2_on = self._level_to_relay_states(target_level)
                 rounded_level = self._relay_states_to_level(relay1_on, relay2_on)
                 
-                self.logger.info(f"Relay2Dimmer '{dev.name}': {target_level}% → {rounded_level}%")
-                
-                # Update device state immediately
-                dev.updateStateOnServer("brightnessLevel", rounded_level)
-                dev.updateStateOnServer("onOffState", rounded_level > 0)
+                self.logger.info("Relay2Dimmer '%s': %s%% → %d%%", dev.name, target_level, rounded_level)
                 
-                # Schedule relay changes with 1 second delay
-                def apply_with_delay():
-                    time.sleep(1)
-                    self.logger.info(f"Applying relay states: Relay1={'ON' if relay1_on else 'OFF'}, Relay2={'ON' if relay2_on else 'OFF'}")
-                    self._apply_relay_states(relay1_id, relay2_id, relay1_on, relay2_on)
+                # Update device state immediately - one batched server call
+                dev.updateStatesOnServer([
+                    {'key': 'brightnessLevel', 'value': rounded_level},
+                    {'key': 'onOffState', 'value': rounded_level > 0},
+                ])
                 
-                thread = threading.Thread(target=apply_with_delay)
-                thread.daemon = True
-                thread.start()
+                # Schedule the relay write on the shared worker with the usual
+                # 1 second settle delay
+                self._schedule_relay_apply(dev.id, relay1_id, relay2_id, relay1_on, relay2_on)
             
             return
         
         # Handle Relay2Fan as a custom device
         if dev.deviceTypeId == "Relay2Fan":
-            relay1_id = dev.pluginProps.get("relay1Device")
-            relay2_id = dev.pluginProps.get("relay2Device")
+            relay1_id, relay2_id = self._get_relay2_config(dev)
             
             if not relay1_id or not relay2_id:
-                self.logger.error(f"Relay2Fan '{dev.name}' is not fully configured")
+                self.logger.error("Relay2Fan '%s' is not fully configured", dev.name)
                 return
             
             target_speed_index = None
@@ -1561,24 +1995,21 @@ class Plugin(indigo.PluginBase):
                 target_speed_index = 0 if current > 0 else 3
             
             if target_speed_index is not None:
-                level = target_speed_index * 33 if target_speed_index > 0 else 0
-                
-                speed_names = ['off', 'low', 'medium', 'high']
-                self.logger.info(f"Relay2Fan '{dev.name}': setting to {speed_names[target_speed_index]}")
-                
-                dev.updateStateOnServer("speedIndex", target_speed_index)
-                dev.updateStateOnServer("speedLevel", level)
-                dev.updateStateOnServer("onOffState", target_speed_index > 0)
-                
-                relay1_on, relay2_on = self._level_to_relay_states(level)
-                
-                def apply_with_delay():
-                    time.sleep(1)
-                    self._apply_relay_states(relay1_id, relay2_id, relay1_on, relay2_on)
-                
-                thread = threading.Thread(target=apply_with_delay)
-                thread.daemon = True
-                thread.start()
+                # Table lookups give both the relay pair and the canonical
+                # level (100 for high, not 3 * 33)
+                relay1_on, relay2_on = _SPEED_TO_RELAYS[target_speed_index]
+                level = _STATES_TO_LEVEL[target_speed_index]
+
+                self.logger.info("Relay2Fan '%s': setting to %s", dev.name, _SPEED_NAMES[target_speed_index])
+
+                dev.updateStatesOnServer([
+                    {'key': 'speedIndex', 'value': target_speed_index},
+                    {'key': 'speedIndex.ui', 'value': _SPEED_NAMES[target_speed_index]},
+                    {'key': 'speedLevel', 'value': level},
+                    {'key': 'onOffState', 'value': target_speed_index > 0},
+                ])
+
+                self._schedule_relay_apply(dev.id, relay1_id, relay2_id, relay1_on, relay2_on)
             
             return
         
@@ -1618,9 +2049,11 @@ class Plugin(indigo.PluginBase):
                 
                 # Set a timer to check in 10 seconds if devices match the scene
                 with self.scene_lock:
+                    check_time = time.time() + 10
                     self.scene_off_timers[dev.id] = {
-                        'check_time': time.time() + 10
+                        'check_time': check_time
                     }
+                    heapq.heappush(self._scene_timer_heap, (check_time, dev.id))
             
             ###### TOGGLE ######
             elif action.deviceAction == indigo.kDeviceAction.Toggle: